@@ -113,6 +113,7 @@ TRIGGER_RULE_RUNNER_CONFIG = {
 # Camera configuration
 CAMERA_CONFIG = {
     "frame_interval": _config["camera"]["frame_interval"],
+    "reconnect_delay": _config["camera"].get("reconnect_delay", 50),
     "camera_img_cache_max_size": max(
         TRIGGER_RULE_RUNNER_CONFIG["vision_use_img_count"],
         CHAT_CONFIG["vision_use_img_count"]
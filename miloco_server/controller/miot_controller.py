@@ -5,17 +5,23 @@
 Xiaomi IoT controller
 Handles Xiaomi IoT device login, authorization, and device management
 """
+import asyncio
+import hashlib
+import itertools
 import logging
 import os
-from collections import OrderedDict
-from datetime import datetime
-from typing import Dict, Optional
-from functools import partial
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterator, Optional, Set, Tuple
+from functools import partial, wraps
+import orjson
 from fastapi import APIRouter, Depends, WebSocket, Query, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi.websockets import WebSocketDisconnect, WebSocketState
 
 from miloco_server.middleware import (
+    token_fingerprint,
     verify_token,
     verify_websocket_token
 )
@@ -30,6 +36,135 @@ router = APIRouter(prefix="/miot", tags=["Xiaomi IoT"])
 
 manager = get_manager()
 
+_TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), "..", "templates", "miot_login_callback.html")
+try:
+    with open(_TEMPLATE_PATH, "r", encoding="utf-8") as _f:
+        # Escape literal braces (CSS/JS) so placeholders can be rendered with a single format_map pass
+        _TEMPLATE: Optional[str] = (
+            _f.read()
+            .replace("{", "{{").replace("}", "}}")
+            .replace("TITLE_PLACEHOLDER", "{title}")
+            .replace("CONTENT_PLACEHOLDER", "{content}")
+            .replace("BUTTON_PLACEHOLDER", "{button}")
+            .replace("STATUS_PLACEHOLDER", "{status}")
+        )
+except FileNotFoundError:
+    logger.error("HTML template file not found: %s", _TEMPLATE_PATH)
+    _TEMPLATE = None
+
+
+class _SWRCache:
+    """Stale-while-revalidate cache for slow-changing MiOT lookups.
+
+    Fresh values (younger than ``ttl``) are returned directly. Stale values
+    (within a further ``stale_ttl``) are returned immediately while a
+    background task revalidates them. Anything older blocks on a fetch.
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float):
+        self._ttl = ttl
+        self._stale_ttl = stale_ttl
+        # Key: cache key, Value: (value, fetched_at)
+        self._entries: Dict[str, Tuple[Any, float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._revalidate_tasks: Dict[str, asyncio.Task] = {}
+
+    async def get(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Get cached value for key, fetching or revalidating as needed."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < self._ttl:
+                return value
+            if age < self._ttl + self._stale_ttl:
+                task = self._revalidate_tasks.get(key)
+                if task is None or task.done():
+                    self._revalidate_tasks[key] = asyncio.create_task(self._revalidate(key, fetch))
+                return value
+        return await self._refresh(key, fetch)
+
+    def invalidate(self, *keys: str) -> None:
+        """Drop cached values for the given keys, or all keys if none given."""
+        if not keys:
+            self._entries.clear()
+            return
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def _refresh(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another waiter may have refreshed while we were queued on the lock
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] < self._ttl:
+                return entry[0]
+            value = await fetch()
+            self._entries[key] = (value, time.monotonic())
+            return value
+
+    async def _revalidate(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            await self._refresh(key, fetch)
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            logger.warning("Background revalidation failed for %s: %s", key, err)
+
+
+_miot_cache = _SWRCache(ttl=10, stale_ttl=30)
+
+# Key: MiotProxy info name, Value: cache keys derived from it
+_REFRESH_CACHE_KEYS: Dict[str, Tuple[str, ...]] = {
+    "cameras": ("camera_list",),
+    "devices": ("device_list",),
+    "scenes": ("scene_actions",),
+    "user_info": ("user_info",),
+}
+
+
+def on_miot_info_refreshed(name: str) -> None:
+    """MiotProxy refresh listener: drop cached lists as soon as the proxy holds newer data."""
+    keys = _REFRESH_CACHE_KEYS.get(name)
+    if keys:
+        _miot_cache.invalidate(*keys)
+
+# In-flight refreshes, Key: refresh name. Duplicate callers await the same future (single-flight)
+_inflight_refreshes: Dict[str, asyncio.Future] = {}
+
+
+async def _single_flight(key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """Run fetch once for all concurrent callers sharing the same key."""
+    future = _inflight_refreshes.get(key)
+    if future is None:
+        future = asyncio.ensure_future(fetch())
+        _inflight_refreshes[key] = future
+        future.add_done_callback(lambda _: _inflight_refreshes.pop(key, None))
+    # Shield so one cancelled caller does not cancel the refresh shared with others
+    return await asyncio.shield(future)
+
+
+def _revalidatable_response(request: Request, message: str, data: Any) -> Response:
+    """Build a JSON response with an ETag, answering 304 when the client's copy is still current."""
+    body = orjson.dumps(
+        NormalResponse.model_construct(code=0, message=message, data=data).model_dump(mode="json"))
+    etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    # no-cache rather than max-age: the client must revalidate so a manual refresh shows up immediately
+    headers = {"Cache-Control": "private, no-cache", "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def log_api_call(name: str, level: int = logging.DEBUG):
+    """Log an API endpoint call with the calling user; read-only endpoints log at DEBUG."""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            # Completion is already recorded by the uvicorn access log
+            logger.log(level, "%s API called, user: %s", name, kwargs.get("current_user"))
+            return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
 
 @router.get("/xiaomi_home_callback", summary="Xiaomi Home authorization callback", response_class=HTMLResponse)
 async def xiaomi_home_callback(code: str, state: str):
@@ -37,17 +172,12 @@ async def xiaomi_home_callback(code: str, state: str):
     logger.info(
         "Xiaomi Home authorization callback: code=%s, state=%s", code, state)
 
-    template_path = os.path.join(os.path.dirname(
-        __file__), "..", "templates", "miot_login_callback.html")
-    try:
-        with open(template_path, "r", encoding="utf-8") as f:
-            template_content = f.read()
-    except FileNotFoundError as exc:
-        logger.error("HTML template file not found: %s", template_path)
-        raise ResourceNotFoundException("HTML template file not found") from exc
+    if _TEMPLATE is None:
+        raise ResourceNotFoundException("HTML template file not found")
 
     try:
         await manager.miot_service.process_xiaomi_home_callback(code, state)
+        _miot_cache.invalidate()
         logger.info("Xiaomi Home authorization callback processed successfully")
         title = "Authorization Successful"
         content = "Xiaomi Home authorization successful, you can close this page"
@@ -68,21 +198,21 @@ async def xiaomi_home_callback(code: str, state: str):
         button = "Close"
         success = False
 
-    web_page = template_content.replace("TITLE_PLACEHOLDER", title)
-    web_page = web_page.replace("CONTENT_PLACEHOLDER", content)
-    web_page = web_page.replace("BUTTON_PLACEHOLDER", button)
-    web_page = web_page.replace(
-        "STATUS_PLACEHOLDER", "true" if success else "false")
+    web_page = _TEMPLATE.format_map({
+        "title": title,
+        "content": content,
+        "button": button,
+        "status": "true" if success else "false",
+    })
 
     return HTMLResponse(content=web_page)
 
 
 @router.get("/login_status", summary="Check MiOT login status", response_model=NormalResponse)
-async def get_miot_login_status(current_user: str = Depends(verify_token)):
+@log_api_call("MiOT login status")
+async def get_miot_login_status(current_user: str = Depends(verify_token)):  # pylint: disable=unused-argument
     """Check MiOT login status"""
-    logger.info("MiOT login status API called, user: %s", current_user)
     result = await manager.miot_service.get_miot_login_status()
-    logger.info("MiOT login status: Login successful")
     return NormalResponse(
         code=0,
         message="Login status checked successfully",
@@ -94,7 +224,7 @@ async def internal_stream_start(did: str, video_quality: int = 2):
     """
     [Hook] 当 MediaMTX 收到 RTSP 请求时，会调用此接口
     """
-    logger.info(f"[On-Demand] Trigger start for {did}")
+    logger.info("[On-Demand] Trigger start for %s", did)
     # 这里不需要回调，因为是直接推流到 MediaMTX
     # 默认请求高清 (Q=2)，你可以根据需要写死或通过参数传递
     await manager.miot_service.start_video_stream(
@@ -110,55 +240,42 @@ async def internal_stream_stop(did: str):
     """
     [Hook] 当没人观看 RTSP 时，会调用此接口
     """
-    logger.info(f"[On-Demand] Trigger stop for {did}")
+    logger.info("[On-Demand] Trigger stop for %s", did)
     await manager.miot_service.stop_video_stream(camera_id=did, channel=0)
     return {"status": "ok"}
 @router.get(path="/user_info", summary="Get MiOT user information", response_model=NormalResponse)
-async def get_miot_user_info(current_user: str = Depends(verify_token)):
+@log_api_call("Get MiOT user info")
+async def get_miot_user_info(
+        request: Request, current_user: str = Depends(verify_token)):  # pylint: disable=unused-argument
     """Get MiOT user information"""
-    logger.info("Get MiOT user info API called, user: %s", current_user)
-    user_info = await manager.miot_service.get_miot_user_info()
-    logger.info("Successfully retrieved Xiaomi Home user information")
-    return NormalResponse(
-        code=0,
-        message="MiOT user information retrieved successfully",
-        data=user_info
-    )
+    user_info = await _miot_cache.get("user_info", manager.miot_service.get_miot_user_info)
+    return _revalidatable_response(request, "MiOT user information retrieved successfully", user_info)
 
 
 @router.get(path="/camera_list", summary="Get MiOT camera list", response_model=NormalResponse)
-async def get_miot_camera_list(current_user: str = Depends(verify_token)):
+@log_api_call("Get MiOT camera list")
+async def get_miot_camera_list(
+        request: Request, current_user: str = Depends(verify_token)):  # pylint: disable=unused-argument
     """Get MiOT camera list"""
-    logger.info("Get MiOT camera list API called, user: %s", current_user)
-    camera_list = await manager.miot_service.get_miot_camera_list()
-    logger.info(
-        "Successfully retrieved Xiaomi Home camera list - Count: %s", len(camera_list))
-    return NormalResponse(
-        code=0,
-        message="MiOT camera list retrieved successfully",
-        data=camera_list
-    )
+    camera_list = await _miot_cache.get("camera_list", manager.miot_service.get_miot_camera_list)
+    return _revalidatable_response(request, "MiOT camera list retrieved successfully", camera_list)
 
 
 @router.get(path="/device_list", summary="Get MiOT device list", response_model=NormalResponse)
-async def get_miot_device_list(current_user: str = Depends(verify_token)):
+@log_api_call("Get MiOT device list")
+async def get_miot_device_list(
+        request: Request, current_user: str = Depends(verify_token)):  # pylint: disable=unused-argument
     """Get MiOT device list"""
-    logger.info("get miot device list, user: %s", current_user)
-    device_list = await manager.miot_service.get_miot_device_list()
-    logger.info("Successfully retrieved Xiaomi Home device list - Count: %s", len(device_list))
-    return NormalResponse(
-        code=0,
-        message="MiOT device list retrieved successfully",
-        data=device_list
-    )
+    device_list = await _miot_cache.get("device_list", manager.miot_service.get_miot_device_list)
+    return _revalidatable_response(request, "MiOT device list retrieved successfully", device_list)
 
 
 @router.get(path="/refresh_miot_all_info", summary="Refresh MiOT all information", response_model=NormalResponse)
-async def refresh_miot_all_info(current_user: str = Depends(verify_token)):
+@log_api_call("Refresh MiOT all info", level=logging.INFO)
+async def refresh_miot_all_info(current_user: str = Depends(verify_token)):  # pylint: disable=unused-argument
     """Refresh MiOT all information"""
-    logger.info("Refresh MiOT all info API called, user: %s", current_user)
-    result = await manager.miot_service.refresh_miot_all_info()
-    logger.info("MiOT information refresh completed: %s", result)
+    result = await _single_flight("refresh_miot_all_info", manager.miot_service.refresh_miot_all_info)
+    _miot_cache.invalidate()
     return NormalResponse(
         code=0,
         message="MiOT information refresh completed",
@@ -167,11 +284,11 @@ async def refresh_miot_all_info(current_user: str = Depends(verify_token)):
 
 
 @router.get(path="/refresh_miot_cameras", summary="Refresh MiOT camera information", response_model=NormalResponse)
-async def refresh_miot_cameras(current_user: str = Depends(verify_token)):
+@log_api_call("Refresh MiOT cameras", level=logging.INFO)
+async def refresh_miot_cameras(current_user: str = Depends(verify_token)):  # pylint: disable=unused-argument
     """Refresh MiOT camera information"""
-    logger.info("Refresh MiOT cameras API called, user: %s", current_user)
-    result = await manager.miot_service.refresh_miot_cameras()
-    logger.info("Successfully refreshed Xiaomi Home camera information")
+    result = await _single_flight("refresh_miot_cameras", manager.miot_service.refresh_miot_cameras)
+    _miot_cache.invalidate("camera_list")
     return NormalResponse(
         code=0,
         message="MiOT camera information refreshed successfully",
@@ -180,11 +297,11 @@ async def refresh_miot_cameras(current_user: str = Depends(verify_token)):
 
 
 @router.get(path="/refresh_miot_scenes", summary="Refresh MiOT scene information", response_model=NormalResponse)
-async def refresh_miot_scenes(current_user: str = Depends(verify_token)):
+@log_api_call("Refresh MiOT scenes", level=logging.INFO)
+async def refresh_miot_scenes(current_user: str = Depends(verify_token)):  # pylint: disable=unused-argument
     """Refresh MiOT scene information"""
-    logger.info("Refresh MiOT scenes API called, user: %s", current_user)
-    result = await manager.miot_service.refresh_miot_scenes()
-    logger.info("Successfully refreshed Xiaomi Home scene information")
+    result = await _single_flight("refresh_miot_scenes", manager.miot_service.refresh_miot_scenes)
+    _miot_cache.invalidate("scene_actions")
     return NormalResponse(
         code=0,
         message="MiOT scene information refreshed successfully",
@@ -193,11 +310,11 @@ async def refresh_miot_scenes(current_user: str = Depends(verify_token)):
 
 
 @router.get(path="/refresh_miot_user_info", summary="Refresh MiOT user information", response_model=NormalResponse)
-async def refresh_miot_user_info(current_user: str = Depends(verify_token)):
+@log_api_call("Refresh MiOT user info", level=logging.INFO)
+async def refresh_miot_user_info(current_user: str = Depends(verify_token)):  # pylint: disable=unused-argument
     """Refresh MiOT user information"""
-    logger.info("Refresh MiOT user info API called, user: %s", current_user)
-    result = await manager.miot_service.refresh_miot_user_info()
-    logger.info("Successfully refreshed Xiaomi Home user information")
+    result = await _single_flight("refresh_miot_user_info", manager.miot_service.refresh_miot_user_info)
+    _miot_cache.invalidate("user_info")
     return NormalResponse(
         code=0,
         message="MiOT user information refreshed successfully",
@@ -206,11 +323,11 @@ async def refresh_miot_user_info(current_user: str = Depends(verify_token)):
 
 
 @router.get(path="/refresh_miot_devices", summary="Refresh MiOT device information", response_model=NormalResponse)
-async def refresh_miot_devices(current_user: str = Depends(verify_token)):
+@log_api_call("Refresh MiOT devices", level=logging.INFO)
+async def refresh_miot_devices(current_user: str = Depends(verify_token)):  # pylint: disable=unused-argument
     """Refresh MiOT device information"""
-    logger.info("Refresh MiOT devices API called, user: %s", current_user)
-    result = await manager.miot_service.refresh_miot_devices()
-    logger.info("Successfully refreshed Xiaomi Home device information")
+    result = await _single_flight("refresh_miot_devices", manager.miot_service.refresh_miot_devices)
+    _miot_cache.invalidate("device_list")
     return NormalResponse(
         code=0,
         message="MiOT device information refreshed successfully",
@@ -219,15 +336,12 @@ async def refresh_miot_devices(current_user: str = Depends(verify_token)):
 
 
 @router.get(path="/miot_scene_actions", summary="Get MiOT scene actions list", response_model=NormalResponse)
-async def get_miot_scene_actions(current_user: str = Depends(verify_token)):
+@log_api_call("Get MiOT scene actions")
+async def get_miot_scene_actions(
+        request: Request, current_user: str = Depends(verify_token)):  # pylint: disable=unused-argument
     """Get MiOT scene actions list"""
-    logger.info("Get MiOT actions API called, user: %s", current_user)
-    actions = await manager.miot_service.get_miot_scene_actions()
-    return NormalResponse(
-        code=0,
-        message="MiOT scene actions list retrieved successfully",
-        data=actions
-    )
+    actions = await _miot_cache.get("scene_actions", manager.miot_service.get_miot_scene_actions)
+    return _revalidatable_response(request, "MiOT scene actions list retrieved successfully", actions)
 
 
 @router.get(path="/send_notify", summary="Send notification", response_model=NormalResponse)
@@ -242,88 +356,202 @@ async def send_notify(notify: str, current_user: str = Depends(verify_token)):
     )
 
 
+@dataclass(slots=True)
+class _VideoStreamConnection:
+    """Video stream WebSocket connection state"""
+    websocket: WebSocket
+    camera_tag: Tuple[str, int, int]
+    user_tag: Tuple[str, str]
+    queue: asyncio.Queue
+    writer: asyncio.Task
+
+
 class MIoTVideoStreamManager:
     """MIoT Video WS Manager."""
     _CAMERA_CONNECT_COUNT_MAX: int = 4
-
-    # Key: "camera_id.channel.video_quality"
-    _camera_connect_map: Dict[str, Dict[str, OrderedDict[str, WebSocket]]]
-    _camera_connect_id: int
+    # Frames buffered per connection before new frames are dropped
+    _SEND_QUEUE_MAX: int = 8
+    # Seconds a single frame send may stall before the client is treated as dead
+    _SEND_TIMEOUT: float = 2.0
+
+    # Key: connection_id
+    _connections: Dict[int, _VideoStreamConnection]
+    # Key: (camera_id, channel, video_quality), Value: {connection_id: send queue}
+    _camera_index: Dict[Tuple[str, int, int], Dict[int, asyncio.Queue]]
+    # Key: (camera_tag, (user_name, token_hash)), oldest connection first
+    _user_index: Dict[Tuple[Tuple[str, int, int], Tuple[str, str]], Deque[int]]
+    # Key: (camera_id, channel, video_quality)
+    _start_tasks: Dict[Tuple[str, int, int], asyncio.Task]
+    # Key: (camera_id, channel, video_quality). Stops still running after the last viewer left
+    _stop_tasks: Dict[Tuple[str, int, int], asyncio.Task]
+    _camera_connect_ids: Iterator[int]
+    _dropped_frames: int
+    _background_tasks: Set[asyncio.Task]
 
     def __init__(self):
-        self._camera_connect_map = {}
-        self._camera_connect_id = 0
+        self._connections = {}
+        self._camera_index = {}
+        self._user_index = {}
+        self._start_tasks = {}
+        self._stop_tasks = {}
+        self._camera_connect_ids = itertools.count()
+        self._dropped_frames = 0
+        self._background_tasks = set()
         logger.info("Init MIoT Video WS Manager")
 
     async def new_connection(
             self, websocket: WebSocket, user_name: str, token_hash: str, camera_id: str, channel: int,
             video_quality: int
-    ) -> str:
+    ) -> int:
         """New video stream connection."""
 
-        camera_tag = f"{camera_id}.{channel}.{video_quality}"
+        camera_tag = (camera_id, channel, video_quality)
 
-        if camera_tag not in self._camera_connect_map or not self._camera_connect_map[camera_tag]:
-            self._camera_connect_map[camera_tag] = {}
+        # The check and the task creation run without an intervening await, so concurrent
+        # connections for the same camera coalesce onto a single start task
+        camera_cids = self._camera_index.get(camera_tag)
+        if not camera_cids:
+            camera_cids = self._camera_index[camera_tag] = {}
 
             callback_func = partial(self.__video_stream_callback, video_quality=video_quality)
 
             logger.info("Requesting stream start: %s", camera_tag)
-            await manager.miot_service.start_video_stream(
-                camera_id=camera_id,
-                channel=channel,
-                callback=callback_func,
-                video_quality=video_quality
-            )
-
-        user_tag = f"{user_name}.{token_hash}"
-        self._camera_connect_map[camera_tag].setdefault(user_tag, OrderedDict())
-        connection_id = str(self._camera_connect_id)
-        self._camera_connect_id += 1
-        self._camera_connect_map[camera_tag][user_tag][connection_id] = websocket
+            start_task = asyncio.create_task(
+                self._start_stream(camera_tag, callback_func, self._stop_tasks.get(camera_tag)))
+            start_task.add_done_callback(partial(self._on_stream_start_done, camera_tag))
+            self._start_tasks[camera_tag] = start_task
+
+        user_tag = (user_name, token_hash)
+        connection_id = next(self._camera_connect_ids)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._SEND_QUEUE_MAX)
+        writer = asyncio.create_task(self._writer_loop(connection_id, websocket, queue))
+        connections = self._connections
+        connections[connection_id] = _VideoStreamConnection(
+            websocket=websocket, camera_tag=camera_tag, user_tag=user_tag, queue=queue, writer=writer)
+        camera_cids[connection_id] = queue
+        user_cids = self._user_index.setdefault((camera_tag, user_tag), deque())
+        user_cids.append(connection_id)
         logger.info("New WS client joined group: %s (ID: %s)", camera_tag, connection_id)
 
-        if len(self._camera_connect_map[camera_tag][user_tag]) > self._CAMERA_CONNECT_COUNT_MAX:
+        if len(user_cids) > self._CAMERA_CONNECT_COUNT_MAX:
             logger.warning("User connection limit reached for %s, removing oldest.", camera_tag)
-            _, ws = self._camera_connect_map[camera_tag][user_tag].popitem(last=False)
+            oldest_cid = user_cids.popleft()
+            camera_cids.pop(oldest_cid, None)
+            oldest = connections.pop(oldest_cid)
+            oldest.writer.cancel()
             try:
-                if ws.client_state == WebSocketState.CONNECTED:
-                    await ws.close()
+                if oldest.websocket.client_state == WebSocketState.CONNECTED:
+                    await asyncio.shield(oldest.websocket.close())
             except Exception as err:
                 logger.error("WebSocket close error: %s", err)
         return connection_id
 
-    async def close_connection(
-            self, user_name: str, token_hash: str, camera_id: str, channel: int, cid: str, video_quality: int
-    ):
+    async def close_connection(self, cid: int, code: int = 1000, reason: Optional[str] = None):
         """Close video stream connection."""
-        camera_tag = f"{camera_id}.{channel}.{video_quality}"
-        user_tag = f"{user_name}.{token_hash}"
-
-        if (
-                camera_tag not in self._camera_connect_map
-                or user_tag not in self._camera_connect_map[camera_tag]
-                or cid not in self._camera_connect_map[camera_tag][user_tag]
-        ):
+        conn = self._connections.pop(cid, None)
+        if conn is None:
             return
 
+        camera_tag = conn.camera_tag
         logger.info("Closing WS client: %s (ID: %s)", camera_tag, cid)
 
+        # The last-viewer decision and the index/start-task release happen before the first await,
+        # so a viewer reconnecting meanwhile gets its own index entry and start instead of being torn down
+        stop_task: Optional[asyncio.Task] = None
+        camera_cids = self._camera_index.get(camera_tag)
+        if camera_cids is not None:
+            camera_cids.pop(cid, None)
+            # 如果该清晰度的所有用户都退出了
+            if not camera_cids:
+                del self._camera_index[camera_tag]
+                stop_task = asyncio.create_task(
+                    self._stop_stream(camera_tag, self._start_tasks.pop(camera_tag, None)))
+                self._stop_tasks[camera_tag] = stop_task
+                stop_task.add_done_callback(partial(self._on_stream_stop_done, camera_tag))
+        user_key = (camera_tag, conn.user_tag)
+        user_cids = self._user_index.get(user_key)
+        if user_cids is not None:
+            if cid in user_cids:
+                user_cids.remove(cid)
+            if not user_cids:
+                self._user_index.pop(user_key, None)
+
         try:
-            ws = self._camera_connect_map[camera_tag][user_tag].pop(cid)
-            if ws.client_state == WebSocketState.CONNECTED:
-                await ws.close()
+            # Pending frames are stale for a live stream, so the writer is cancelled rather than drained
+            conn.writer.cancel()
+            if conn.websocket.client_state == WebSocketState.CONNECTED:
+                await asyncio.shield(conn.websocket.close(code=code, reason=reason))
         except Exception as err:
             logger.error("WebSocket close error: %s", err)
 
-        if len(self._camera_connect_map[camera_tag][user_tag]) == 0:
-            self._camera_connect_map[camera_tag].pop(user_tag, None)
+        if stop_task is not None:
+            # Shielded so a cancelled endpoint cannot leave the upstream stream half-stopped
+            await asyncio.shield(stop_task)
+
+    @staticmethod
+    async def _start_stream(camera_tag: Tuple[str, int, int], callback: Callable,
+                            pending_stop: Optional[asyncio.Task]):
+        if pending_stop is not None:
+            # The previous viewers' stop must land first, otherwise it would tear down this start
+            await asyncio.wait([pending_stop])
+        camera_id, channel, video_quality = camera_tag
+        await manager.miot_service.start_video_stream(
+            camera_id=camera_id,
+            channel=channel,
+            callback=callback,
+            video_quality=video_quality
+        )
 
-        # 如果该清晰度的所有用户都退出了
-        if len(self._camera_connect_map[camera_tag]) == 0:
-            logger.info("No clients left for %s, stopping stream.", camera_tag)
-            await manager.miot_service.stop_video_stream(camera_id, channel, video_quality=video_quality)
-            self._camera_connect_map.pop(camera_tag)
+    @staticmethod
+    async def _stop_stream(camera_tag: Tuple[str, int, int], start_task: Optional[asyncio.Task]):
+        if start_task is not None and not start_task.done():
+            # Let a pending start finish so the stop below tears it down
+            await asyncio.wait([start_task])
+        logger.info("No clients left for %s, stopping stream.", camera_tag)
+        camera_id, channel, video_quality = camera_tag
+        await manager.miot_service.stop_video_stream(camera_id, channel, video_quality=video_quality)
+
+    def _on_stream_stop_done(self, camera_tag: Tuple[str, int, int], task: asyncio.Task):
+        if self._stop_tasks.get(camera_tag) is task:
+            del self._stop_tasks[camera_tag]
+
+    def _on_stream_start_done(self, camera_tag: Tuple[str, int, int], task: asyncio.Task):
+        if task.cancelled():
+            return
+        err = task.exception()
+        if err is None:
+            return
+        logger.error("Failed to start stream %s: %s", camera_tag, err)
+        # A last-viewer close may already have released the tag, and a newer start may own it by now
+        if self._start_tasks.get(camera_tag) is not task:
+            return
+        # Unpublished here so the next viewer retries the start instead of joining a dead stream
+        del self._start_tasks[camera_tag]
+        camera_cids = self._camera_index.pop(camera_tag, None) or {}
+        for cid in list(camera_cids):
+            self._spawn(self.close_connection(cid, code=1011, reason="Stream start failed"))
+
+    def _spawn(self, coro: Awaitable[Any]) -> None:
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _writer_loop(self, cid: int, websocket: WebSocket, queue: asyncio.Queue):
+        """Drain queued frames to a single WebSocket, removing the connection once a send fails or stalls."""
+        while True:
+            frame = await queue.get()
+            try:
+                await asyncio.wait_for(websocket.send_bytes(frame), timeout=self._SEND_TIMEOUT)
+            except (asyncio.TimeoutError, ConnectionError, RuntimeError, WebSocketDisconnect) as err:
+                # Client went away or stalled: routine, and at most one message per connection
+                logger.debug("Send stream failed, removing connection %s: %r", cid, err)
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                logger.error("Send stream error, removing connection %s: %s", cid, err)
+            else:
+                continue
+            # Scheduled rather than awaited: close_connection cancels this writer
+            self._spawn(self.close_connection(cid))
+            return
 
     async def __video_stream_callback(
             self, did: str, data: bytes, ts: int, seq: int, channel: int,
@@ -333,7 +561,7 @@ class MIoTVideoStreamManager:
         回调函数：负责向 WebSocket 发送数据
         packet_type: 1=视频, 2=音频
         """
-        camera_tag = f"{did}.{channel}.{video_quality}"
+        camera_tag = (did, channel, video_quality)
 
         # [关键修改] 构建带头部的包: Type(1 byte) + Payload
         # to_bytes(1, ...) 生成 b'\x01'，to_bytes(1, ...) 生成 b'\x02'
@@ -341,17 +569,17 @@ class MIoTVideoStreamManager:
         # packet = header + data
         packet = data
 
-        # 获取该相机组下的所有连接
-        if camera_tag in self._camera_connect_map:
-            user_map = self._camera_connect_map[camera_tag]
-            for user_tag, connections in user_map.items():
-                for cid, ws in list(connections.items()):
-                    try:
-                        # 发送带头部的二进制包
-                        await ws.send_bytes(packet)
-                    except Exception as e:
-                        logger.error(f"Send stream error: {e}")
-                        # 可以在这里处理断开连接的逻辑
+        # 获取该相机组下的所有连接，仅入队不等待发送，慢连接只会丢自己的帧
+        # 所有连接共享同一个 packet 对象（按引用传递，不做逐连接拷贝）
+        queues = self._camera_index.get(camera_tag)
+        if queues:
+            for queue in queues.values():
+                try:
+                    queue.put_nowait(packet)
+                except asyncio.QueueFull:
+                    self._dropped_frames += 1
+                    logger.debug("Send queue full for %s, dropped frames: %d",
+                                 camera_tag, self._dropped_frames)
 
 
 miot_video_stream_manager = MIoTVideoStreamManager()
@@ -371,9 +599,10 @@ async def video_stream_websocket(
         current_user, camera_id, channel, video_quality
     )
 
-    start_time: datetime = datetime.now()
-    token_hash: str = str(hash(websocket.cookies.get("access_token")))
-    cid: Optional[str] = None
+    start_time: float = time.monotonic()
+    # Digest of the token rather than the token itself, so the user tag never holds a raw JWT
+    token_hash: str = token_fingerprint(websocket.cookies.get("access_token") or "")
+    cid: Optional[int] = None
 
     try:
         await websocket.accept()
@@ -386,13 +615,10 @@ async def video_stream_websocket(
             video_quality=video_quality,
         )
 
-        while True:
-            try:
-                message = await websocket.receive_text()
-                if message == "ping":
-                    await websocket.send_text("pong")
-            except Exception:
-                break
+        # iter_text ends cleanly on disconnect; only heartbeat messages are acted on
+        async for message in websocket.iter_text():
+            if message == "ping" and websocket.client_state == WebSocketState.CONNECTED:
+                await websocket.send_text("pong")
 
     except WebSocketDisconnect:
         logger.warning("Client disconnected: %s, Q=%d", camera_id, video_quality)
@@ -403,15 +629,8 @@ async def video_stream_websocket(
         except:
             pass
     finally:
-        if cid:
-            await miot_video_stream_manager.close_connection(
-                user_name=current_user,
-                token_hash=token_hash,
-                camera_id=camera_id,
-                channel=channel,
-                cid=cid,
-                video_quality=video_quality
-            )
-
-        duration = (datetime.now() - start_time).total_seconds()
+        if cid is not None:
+            await miot_video_stream_manager.close_connection(cid)
+
+        duration = time.monotonic() - start_time
         logger.info("WS Session ended. Duration: %.2fs", duration)
\ No newline at end of file
@@ -7,6 +7,7 @@ Handles CRUD operations for kv table, provides generic key-value storage functio
 """
 
 import logging
+import sqlite3
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 from miloco_server.utils.database import get_db_connector
@@ -20,7 +21,8 @@ class KVDao:
     def __init__(self):
         self.db_connector = get_db_connector()
         self.cache = self.get_all_as_dict()
-        logger.info("KVDao init, current: %s", self.cache)
+        # Values hold OAuth tokens and account info, so only the keys are logged
+        logger.info("KVDao init, current keys: %s", list(self.cache))
 
 
     def set(self, key: str, value: str) -> bool:
@@ -47,14 +49,46 @@ class KVDao:
             """
             params = (key, value, current_time, current_time)
             affected_rows = self.db_connector.execute_update(sql, params)
+            # Values can be whole device/camera dumps or credentials, so only their size is logged
             if affected_rows > 0:
-                logger.info("KV set successfully: key=%s, value=%s", key, value)
+                logger.info("KV set successfully: key=%s, size=%d", key, len(value))
                 return True
             else:
-                logger.warning("Failed to set kv: key=%s, value=%s", key, value)
+                logger.warning("Failed to set kv: key=%s, size=%d", key, len(value))
                 return False
         except (ValueError, TypeError, KeyError, AttributeError) as e:
-            logger.error("Error setting kv: key=%s, value=%s, error=%s", key, value, e)
+            logger.error("Error setting kv: key=%s, error=%s", key, e)
+            return False
+
+    def set_many(self, items: Dict[str, str]) -> bool:
+        """
+        Set multiple configuration items in a single transaction
+
+        Args:
+            items: Dictionary with key as key, value as value
+
+        Returns:
+            bool: True if operation successful, False otherwise
+        """
+        if not items:
+            return True
+        try:
+            current_time = datetime.now().isoformat()
+            sql = """
+                INSERT INTO kv (key, value, created_at, updated_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET
+                    value = excluded.value,
+                    updated_at = excluded.updated_at
+            """
+            params_list = [(key, value, current_time, current_time) for key, value in items.items()]
+            self.db_connector.execute_many(sql, params_list)
+            # Only cached once committed, callers compare against the cache to skip unchanged writes
+            self.cache.update(items)
+            logger.info("KV set successfully: keys=%s", list(items))
+            return True
+        except (sqlite3.Error, ValueError, TypeError, KeyError, AttributeError) as e:
+            logger.error("Error setting kv: keys=%s, error=%s", list(items), e)
             return False
 
     def _get_by_key(self, key: str) -> Optional[Dict[str, Any]]:
@@ -6,7 +6,9 @@ MILOCO Server main application entry point.
 Provides FastAPI application setup, middleware configuration, and server startup.
 """
 
+import importlib.util
 import logging
+import os
 import threading
 import time
 import webbrowser
@@ -29,6 +31,7 @@ from miloco_server.controller import (
     trigger_router,
     web_router,
 )
+from miloco_server.controller.miot_controller import on_miot_info_refreshed
 from miloco_server.middleware.auth_middleware import AuthStaticFiles
 from miloco_server.middleware.exception_handler import handle_exception
 from miloco_server.service.manager import get_manager
@@ -73,23 +76,24 @@ else:
     logger.info("Lite Mode active: Skipping Chat, Trigger, and Model routers.")
 
 
+# The built frontend does not change while the server runs, so the index file is resolved once
+_API_PREFIXES = ("api/",)
+_INDEX_FILE = str(STATIC_DIR / "index.html")
+_INDEX_EXISTS = os.path.isfile(_INDEX_FILE)
+
+
 @app.get("/{full_path:path}")
 async def spa_handler(full_path: str):
     """SPA route handler - catch all unmatched GET requests"""
-    if full_path.startswith("api/"):
-        return Response(status_code=404, content="404 Not Found")
-
-    index_file = STATIC_DIR / "index.html"
-    if index_file.exists():
-        return FileResponse(str(index_file))
-    else:
+    if full_path.startswith(_API_PREFIXES) or not _INDEX_EXISTS:
         return Response(status_code=404, content="404 Not Found")
+    return FileResponse(_INDEX_FILE)
 
 
 @app.on_event("startup")
 async def startup_event():
     """Application initialization operations on startup"""
-    logger.info(f"Initializing application (Lite Mode: {LITE_MODE})...")
+    logger.info("Initializing application (Lite Mode: %s)...", LITE_MODE)
 
     # 总是启动 RTSP Server
     rtsp_server.start()
@@ -106,6 +110,8 @@ async def startup_event():
     try:
         # initialize 方法内部已经处理了 LITE_MODE 的逻辑，这里直接调用即可
         await get_manager().initialize(callback=open_browser_async)
+        # Token-refresh and background refreshes bypass the refresh endpoints, so the API cache follows the proxy
+        get_manager().miot_service.add_refresh_listener(on_miot_info_refreshed)
         logger.info("Manager initialization completed")
     except Exception as e:
         logger.error("Manager initialization failed: %s", e)
@@ -117,9 +123,10 @@ async def shutdown_event():
     """Cleanup operations when application shuts down"""
     # [关键修改] 安全停止后台任务
     manager = get_manager()
-    if not LITE_MODE and getattr(manager, "trigger_rule_runner", None):
+    trigger_rule_runner = getattr(manager, "trigger_rule_runner", None)
+    if trigger_rule_runner is not None and trigger_rule_runner.is_task_running():
         logger.info("Stopping trigger rule runner...")
-        manager.trigger_rule_runner.stop()
+        await trigger_rule_runner.stop_periodic_task()
 
     rtsp_server.stop()
     logger.info("Application is shutting down...")
@@ -144,9 +151,11 @@ def open_browser_async():
 def start_server():
     """Start server and automatically open browser"""
     logger.debug("Debug log test - if you see this message, debug logging is enabled")
-    logger.info(f"Starting Miloco server (Lite Mode: {LITE_MODE})...")
+    logger.info("Starting Miloco server (Lite Mode: %s)...", LITE_MODE)
 
     log_config = get_uvicorn_log_config()
+    # uvloop is unavailable on Windows, fall back to the stdlib event loop there
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
     update_localhost_cert(cert_path=SERVER_CONFIG["ssl_certfile"], key_path=SERVER_CONFIG["ssl_keyfile"])
 
     uvicorn.run(
@@ -155,6 +164,8 @@ def start_server():
         port=SERVER_CONFIG["port"],
         log_level=SERVER_CONFIG["log_level"],
         log_config=log_config,
+        loop=loop,
+        http="httptools",
         ssl_certfile=SERVER_CONFIG["ssl_certfile"],
         ssl_keyfile=SERVER_CONFIG["ssl_keyfile"]
     )
\ No newline at end of file
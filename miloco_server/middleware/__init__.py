@@ -29,6 +29,7 @@ from .auth_middleware import (
     clear_auth_cookie,
     invalidate_all_tokens,
     is_token_valid,
+    token_fingerprint,
     ADMIN_USERNAME
 )
 
@@ -55,5 +56,6 @@ __all__ = [
     "clear_auth_cookie",
     "invalidate_all_tokens",
     "is_token_valid",
+    "token_fingerprint",
     "ADMIN_USERNAME"
 ]
@@ -5,12 +5,15 @@
 Authentication middleware
 Provides JWT token creation, verification and management functionality
 """
+import hashlib
 import logging
+import threading
 import time
 from datetime import datetime, timedelta
 from typing import Optional
 
 import jwt
+from cachetools import TTLCache
 from fastapi import Request, Response, HTTPException, status
 from fastapi.staticfiles import StaticFiles
 from fastapi.websockets import WebSocket
@@ -27,6 +30,16 @@ logger.info("Authentication middleware initialized - All old JWT tokens invalida
 
 ADMIN_USERNAME = "admin"
 
+# Verified token cache, Key: token digest (raw tokens are not retained), Value: (username, iat, exp)
+# Sync dependencies run in the threadpool, so access is guarded by a lock
+_token_cache: TTLCache[str, tuple[str, int, int]] = TTLCache(maxsize=10_000, ttl=300)
+_token_cache_lock = threading.Lock()
+
+
+def token_fingerprint(token: str) -> str:
+    """Stable, collision-resistant token digest, identical across worker processes"""
+    return hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+
 def invalidate_all_tokens():
     """
     Invalidate all JWT tokens
@@ -35,6 +48,8 @@ def invalidate_all_tokens():
     global token_invalidation_time
     current_time = int(time.time())
     token_invalidation_time = current_time
+    with _token_cache_lock:
+        _token_cache.clear()
     logger.info("All JWT tokens invalidated, invalidation timestamp: %s", current_time)
 
 def is_token_valid(token_issued_at: int) -> bool:
@@ -83,6 +98,16 @@ def _verify_jwt_token_internal(token: Optional[str]) -> str:
     if not token:
         raise AuthenticationException("Authentication token not found, please login first")
 
+    cache_key = token_fingerprint(token)
+    with _token_cache_lock:
+        cached = _token_cache.get(cache_key)
+    if cached is not None and cached[2] > time.time():
+        # A verify racing a logout can write its entry back after the cache was cleared,
+        # so the invalidation time is checked on every hit as well
+        if not is_token_valid(cached[1]):
+            raise AuthenticationException("Authentication token has been invalidated, please login again")
+        return cached[0]
+
     try:
         payload = jwt.decode(token, JWT_CONFIG["secret_key"], algorithms=[JWT_CONFIG["algorithm"]])
         username: str = payload.get("sub")
@@ -96,6 +121,10 @@ def _verify_jwt_token_internal(token: Optional[str]) -> str:
         if not is_token_valid(token_issued_at):
             raise AuthenticationException("Authentication token has been invalidated, please login again")
 
+        token_expires_at = payload.get("exp")
+        if token_expires_at is not None:
+            with _token_cache_lock:
+                _token_cache[cache_key] = (username, token_issued_at, token_expires_at)
         return username
     except jwt.ExpiredSignatureError as exc:
         raise AuthenticationException("Authentication token has expired, please login again") from exc
@@ -4,14 +4,14 @@
 """MIoT proxy module for handling Xiaomi IoT device related operations."""
 
 import asyncio
-import copy
-import json
 import logging
 import time
 from typing import Callable, Coroutine, Optional, List, Dict, Set
 
-from pydantic_core import to_jsonable_python
+import aiohttp
+from pydantic import TypeAdapter
 from miot.client import MIoTClient
+from miot.error import MIoTError
 from miot.types import MIoTOauthInfo, MIoTCameraInfo, MIoTDeviceInfo, MIoTManualSceneInfo, MIoTUserInfo, \
     MIoTCameraVideoQuality, MIoTCameraStatus
 from miot.camera import MIoTCameraInstance
@@ -23,9 +23,27 @@ from miloco_server.utils.carmera_vision_handler import CameraVisionHandler
 
 logger = logging.getLogger(__name__)
 
+# Built once: validators/serializers for the cached MiOT info persisted to KV
+_CAMERA_INFO_ADAPTER = TypeAdapter(dict[str, MIoTCameraInfo])
+_DEVICE_INFO_ADAPTER = TypeAdapter(dict[str, MIoTDeviceInfo])
+_SCENE_INFO_ADAPTER = TypeAdapter(dict[str, MIoTManualSceneInfo])
+_USER_INFO_ADAPTER = TypeAdapter(Optional[MIoTUserInfo])
+
+# Expected failures talking to the MiOT cloud; anything else is a bug and propagates to the caller
+_TRANSIENT_ERRORS = (MIoTError, aiohttp.ClientError, asyncio.TimeoutError)
+
 
 class MiotProxy:
     """Xiaomi IoT proxy class responsible for handling MIoT device related operations."""
+    # Refresh the OAuth token this many seconds before it expires
+    _TOKEN_REFRESH_AHEAD: int = 1800
+    # Lower bound between refresh attempts, so a short-lived token cannot make the loop spin
+    _TOKEN_REFRESH_MIN_INTERVAL: int = 60
+    # Upper bound on one sleep: the loop clock stops while the host is suspended, so the wall-clock
+    # deadline is re-read at least this often
+    _TOKEN_REFRESH_MAX_INTERVAL: int = 600
+    # Upper bound on keep-alive connections handshaking at once, e.g. all cameras reappearing after a network blip
+    _KEEP_ALIVE_CONNECT_CONCURRENCY: int = 4
 
     def __init__(self,
                  uuid: str,
@@ -38,8 +56,23 @@ class MiotProxy:
 
         # Key: did
         self._camera_img_managers: dict[str, CameraVisionHandler] = {}
+        # Key: did. Serializes create/update/destroy of one camera's manager; different cameras run concurrently
+        self._did_locks: Dict[str, asyncio.Lock] = {}
+        # Key: did. Nothing in the tree subscribes: start/stop_camera_raw_stream are logging stubs, so the
+        # callbacks are never hashed and a subscriber-id map would have nothing to key
         self._stream_subscribers: Dict[str, Set[Callable]] = {}
+        # Key: did. When the camera's last connection was torn down, see _wait_reconnect_delay
+        self._camera_destroyed_at: Dict[str, float] = {}
+        self._keep_alive_connect_slots = asyncio.Semaphore(self._KEEP_ALIVE_CONNECT_CONCURRENCY)
         self._token_refresh_task: Optional[asyncio.Task] = None
+        # Set whenever the OAuth token changes so the refresh task recomputes its deadline
+        self._token_refresh_wakeup = asyncio.Event()
+        # Serializes offloaded KV writes so a slower, older write cannot land after a newer one
+        self._kv_write_lock = asyncio.Lock()
+        # In-flight lazy refreshes, Key: info name. Concurrent getters await the same task
+        self._lazy_refresh_tasks: Dict[str, asyncio.Task] = {}
+        # Called with the info name ("cameras", "devices", "scenes", "user_info") after each successful refresh
+        self._refresh_listeners: List[Callable[[str], None]] = []
 
         self._miot_client = MIoTClient(
             uuid=uuid,
@@ -50,6 +83,7 @@ class MiotProxy:
         )
 
         self._frame_interval: int = CAMERA_CONFIG["frame_interval"]
+        self._reconnect_delay: float = CAMERA_CONFIG["reconnect_delay"] / 1000
         self._camera_img_cache_max_size: int = CAMERA_CONFIG["camera_img_cache_max_size"]
         self._camera_img_cache_ttl: int = max(1, int(self._frame_interval * self._camera_img_cache_max_size / 1000 * 2))
 
@@ -58,23 +92,42 @@ class MiotProxy:
         return self._miot_client
 
     def get_camera_instance(self, did: str) -> Optional[MIoTCameraInstance]:
-        if did in self._camera_img_managers:
-            return self._camera_img_managers[did].miot_camera_instance
-        return None
+        camera_img_manager = self._camera_img_managers.get(did)
+        return camera_img_manager.miot_camera_instance if camera_img_manager is not None else None
 
     def get_camera_vision_handler(self, did: str) -> Optional[CameraVisionHandler]:
         return self._camera_img_managers.get(did)
 
+    def _did_lock(self, did: str) -> asyncio.Lock:
+        # Locks are kept for the proxy's lifetime: there is one per camera, and dropping a lock
+        # another coroutine is waiting on would let two holders in
+        lock = self._did_locks.get(did)
+        if lock is None:
+            lock = self._did_locks[did] = asyncio.Lock()
+        return lock
+
     async def destroy_camera_proxy(self, did: str):
-        if did in self._camera_img_managers:
-            logger.info(f"Destroying camera proxy for {did}...")
+        await self._destroy_camera_manager(did)
+
+    async def _destroy_camera_manager(self, did: str) -> bool:
+        async with self._did_lock(did):
+            # Unpublished before destroy so nobody picks up a half torn-down manager
+            camera_img_manager = self._camera_img_managers.pop(did, None)
+            if camera_img_manager is None:
+                return False
+            logger.info("Destroying camera proxy for %s...", did)
             try:
-                await self._camera_img_managers[did].destroy()
+                await camera_img_manager.destroy()
             except Exception as e:
-                logger.warning(f"Error destroying camera {did}: {e}")
-            finally:
-                self._camera_img_managers.pop(did, None)
-            await asyncio.sleep(0.5)
+                logger.warning("Error destroying camera %s: %s", did, e)
+            self._camera_destroyed_at[did] = time.monotonic()
+            return True
+
+    async def _update_camera_manager(self, did: str, camera_info: MIoTCameraInfo):
+        async with self._did_lock(did):
+            camera_img_manager = self._camera_img_managers.get(did)
+            if camera_img_manager is not None:
+                await camera_img_manager.update_camera_info(camera_info)
 
     @classmethod
     async def create_miot_proxy(cls, uuid: str, redirect_uri: str, kv_dao: KVDao,
@@ -92,37 +145,49 @@ class MiotProxy:
             await self.refresh_miot_info()
 
     async def refresh_miot_info(self) -> dict:
-        result = {"cameras": False, "scenes": False, "user_info": False, "devices": False}
+        refreshes = (
+            ("cameras", self.refresh_cameras, DeviceInfoKeys.CAMERA_INFO_KEY, _CAMERA_INFO_ADAPTER),
+            ("scenes", self.refresh_scenes, DeviceInfoKeys.SCENE_INFO_KEY, _SCENE_INFO_ADAPTER),
+            ("user_info", self.refresh_user_info, DeviceInfoKeys.USER_INFO_KEY, _USER_INFO_ADAPTER),
+            ("devices", self.refresh_devices, DeviceInfoKeys.DEVICE_INFO_KEY, _DEVICE_INFO_ADAPTER),
+        )
+        if self._oauth_info is None:
+            logger.info("MiOT not authorized, skip MiOT info refresh")
+            return {name: False for name, _, _, _ in refreshes}
 
+        # Persisted below in one KV transaction instead of one write per refresh
         results = await asyncio.gather(
-            self.refresh_cameras(),
-            self.refresh_scenes(),
-            self.refresh_user_info(),
-            self.refresh_devices(),
+            *(refresh(persist=False) for _, refresh, _, _ in refreshes),
             return_exceptions=True
         )
 
-        result["cameras"] = not isinstance(results[0], Exception) and results[0] is not None
-        result["scenes"] = not isinstance(results[1], Exception) and results[1] is not None
-        result["user_info"] = not isinstance(results[2], Exception) and results[2] is not None
-        result["devices"] = not isinstance(results[3], Exception) and results[3] is not None
+        result = {}
+        payloads = {}
+        for (name, _, key, adapter), value in zip(refreshes, results):
+            if isinstance(value, Exception):
+                # One failed refresh must not hide the outcome of the others
+                logger.error("Failed to refresh MiOT %s: %s", name, value)
+                result[name] = False
+                continue
+            result[name] = value is not None
+            if value is not None:
+                payloads[key] = adapter.dump_json(value)
+        await self._persist_if_changed(payloads)
 
         logger.info("MiOT info refresh completed: %s", result)
         return result
 
     def init_miot_info_dict(self):
         try:
-            self._camera_info_dict: dict[str, MIoTCameraInfo] = {
-                did: MIoTCameraInfo.model_validate(camera_info)
-                for did, camera_info in json.loads(self._kv_dao.get(DeviceInfoKeys.CAMERA_INFO_KEY) or "{}").items()}
+            # Each dict is validated straight from the stored JSON in a single pydantic-core call
+            self._camera_info_dict: dict[str, MIoTCameraInfo] = _CAMERA_INFO_ADAPTER.validate_json(
+                self._kv_dao.get(DeviceInfoKeys.CAMERA_INFO_KEY) or "{}")
 
-            self._device_info_dict: dict[str, MIoTDeviceInfo] = {
-                did: MIoTDeviceInfo.model_validate(device_info)
-                for did, device_info in json.loads(self._kv_dao.get(DeviceInfoKeys.DEVICE_INFO_KEY) or "{}").items()}
+            self._device_info_dict: dict[str, MIoTDeviceInfo] = _DEVICE_INFO_ADAPTER.validate_json(
+                self._kv_dao.get(DeviceInfoKeys.DEVICE_INFO_KEY) or "{}")
 
-            self._scene_info_dict: dict[str, MIoTManualSceneInfo] = {
-                scene_id: MIoTManualSceneInfo.model_validate(scene_info)
-                for scene_id, scene_info in json.loads(self._kv_dao.get(DeviceInfoKeys.SCENE_INFO_KEY) or "{}").items()}
+            self._scene_info_dict: dict[str, MIoTManualSceneInfo] = _SCENE_INFO_ADAPTER.validate_json(
+                self._kv_dao.get(DeviceInfoKeys.SCENE_INFO_KEY) or "{}")
 
             user_info_str = self._kv_dao.get(DeviceInfoKeys.USER_INFO_KEY)
             self._user_info = MIoTUserInfo.model_validate_json(user_info_str) if user_info_str else None
@@ -130,7 +195,7 @@ class MiotProxy:
             oauth_info_str = self._kv_dao.get(AuthConfigKeys.MIOT_TOKEN_INFO_KEY)
             self._oauth_info = MIoTOauthInfo.model_validate_json(oauth_info_str) if oauth_info_str else None
         except Exception as e:
-            logger.error(f"Failed to load cached info from KV: {e}")
+            logger.error("Failed to load cached info from KV: %s", e)
             self._camera_info_dict = {}
             self._device_info_dict = {}
             self._scene_info_dict = {}
@@ -138,37 +203,41 @@ class MiotProxy:
             self._oauth_info = None
 
     def get_recent_camera_img(self, camera_id: str, channel: int, recent_count: int) -> CameraImgSeq | None:
-        if camera_id in self._camera_img_managers:
-            return self._camera_img_managers[camera_id].get_recents_camera_img(channel, recent_count)
+        camera_img_manager = self._camera_img_managers.get(camera_id)
+        if camera_img_manager is not None:
+            return camera_img_manager.get_recents_camera_img(channel, recent_count)
         return None
 
     async def create_camera_proxy(self, did: str, target_quality: int = None):
         if did in self._camera_img_managers:
             return
 
-        if not self._camera_info_dict or did not in self._camera_info_dict:
+        if did not in self._camera_info_dict:
             await self.refresh_cameras()
 
         if did in self._camera_info_dict:
             q = target_quality if target_quality is not None else MIoTCameraVideoQuality.HIGH.value
-            await self._create_camera_img_manager(
-                self._camera_info_dict[did],
-                target_quality=q
-            )
+            async with self._did_lock(did):
+                # Re-checked under the lock: a concurrent refresh may have created it meanwhile
+                if did in self._camera_img_managers:
+                    return
+                await self._create_camera_img_manager(
+                    self._camera_info_dict[did],
+                    target_quality=q
+                )
         else:
-            logger.warning(f"Cannot create proxy for unknown camera: {did}")
+            logger.warning("Cannot create proxy for unknown camera: %s", did)
 
     async def _master_stream_callback(self, did: str, data: bytes, ts: int, seq: int, channel: int, frame_type: int = None):
-        if did in self._stream_subscribers:
-            subscribers = list(self._stream_subscribers[did])
-            for callback in subscribers:
-                try:
-                    # 注意：这里的下游 callback 可能也没更新签名
-                    # 如果下游 callback (比如 WS) 不需要 frame_type，我们就不传给它，或者由下游自己处理
-                    # 目前主要目的是防止这里 crash
-                    await callback(did, data, ts, seq, channel)
-                except Exception as e:
-                    logger.error("Error in subscriber callback for %s: %s", did, e)
+        # A did's set is only ever dropped whole, never mutated in place, so it is iterated without a per-frame copy
+        for callback in self._stream_subscribers.get(did, ()):
+            try:
+                # 注意：这里的下游 callback 可能也没更新签名
+                # 如果下游 callback (比如 WS) 不需要 frame_type，我们就不传给它，或者由下游自己处理
+                # 目前主要目的是防止这里 crash
+                await callback(did, data, ts, seq, channel)
+            except Exception as e:
+                logger.error("Error in subscriber callback for %s: %s", did, e)
 
     async def _dummy_audio_callback(self, did: str, data: bytes, ts: int, seq: int, channel: int):
         pass
@@ -189,10 +258,11 @@ class MiotProxy:
     async def _create_camera_img_manager(self, camera_info: MIoTCameraInfo,
                                          target_quality: int = None) -> CameraVisionHandler | None:
         quality_val = target_quality if target_quality is not None else MIoTCameraVideoQuality.HIGH.value
-        camera_info_copy = copy.deepcopy(camera_info)
-        camera_info_copy.video_quality = quality_val
+        # Only scalar fields of the copy are ever reassigned, a shallow copy is enough
+        camera_info_copy = camera_info.model_copy(update={"video_quality": quality_val})
 
         logger.info("[Proxy] Creating connection for %s (Q=%s)...", camera_info.did, quality_val)
+        await self._wait_reconnect_delay(camera_info.did)
 
         try:
             camera_instance = await self._get_camera_instance(camera_info_copy)
@@ -215,6 +285,26 @@ class MiotProxy:
             return camera_img_manager
         return None
 
+    async def _wait_reconnect_delay(self, did: str):
+        # destroy_async returns once the session is stopped and freed, the short settle time only covers
+        # the device side; it is paid by an immediate reconnect, not by every destroy
+        destroyed_at = self._camera_destroyed_at.pop(did, None)
+        if destroyed_at is not None:
+            remaining = self._reconnect_delay - (time.monotonic() - destroyed_at)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+
+    async def _create_keep_alive_manager(self, camera_info: MIoTCameraInfo):
+        # The slot is taken before the did lock so a queued camera does not block that camera's other operations
+        async with self._keep_alive_connect_slots, self._did_lock(camera_info.did):
+            if camera_info.did in self._camera_img_managers:
+                return
+            logger.info("[Refresh] Auto-connecting %s (Q=1) for Keep-Alive", camera_info.did)
+            camera_img_manager = await self._create_camera_img_manager(camera_info, target_quality=1)
+            if camera_img_manager is not None:
+                # 注册主回调以消耗视频数据
+                await camera_img_manager.register_raw_stream(self._master_stream_callback, 0)
+
     async def _get_camera_instance(self, camera_info: MIoTCameraInfo, target_quality: int = None) -> Optional[
         MIoTCameraInstance]:
         try:
@@ -229,55 +319,78 @@ class MiotProxy:
     #  Getters & Refreshers
     # ==========================================================================
 
+    async def _persist_if_changed(self, payloads: Dict[str, bytes]):
+        # Periodic refreshes mostly return identical data, skip the SQLite upsert in that case
+        async with self._kv_write_lock:
+            changed = {}
+            for key, payload in payloads.items():
+                value = payload.decode()
+                if self._kv_dao.get(key) != value:
+                    changed[key] = value
+            if changed:
+                # The SQLite write blocks on disk I/O, keep it off the event loop. A failed write leaves
+                # the KV cache untouched, so the next refresh retries it; the in-memory info stays current
+                if not await asyncio.to_thread(self._kv_dao.set_many, changed):
+                    logger.warning("Failed to persist MiOT info: %s", list(changed))
+
+    async def _refresh_once(self, name: str, refresh: Callable[[], Coroutine]):
+        task = self._lazy_refresh_tasks.get(name)
+        if task is None or task.done():
+            task = self._lazy_refresh_tasks[name] = asyncio.create_task(refresh())
+        # Shielded so one cancelled getter does not abort the refresh the others are waiting on
+        return await asyncio.shield(task)
+
     async def get_cameras(self) -> dict[str, MIoTCameraInfo]:
         if not self._camera_info_dict:
-            await self.refresh_cameras()
+            await self._refresh_once("cameras", self.refresh_cameras)
         return self._camera_info_dict
 
-    async def refresh_cameras(self) -> dict[str, MIoTCameraInfo] | None:
+    async def refresh_cameras(self, persist: bool = True) -> dict[str, MIoTCameraInfo] | None:
+        if self._oauth_info is None:
+            logger.debug("MiOT not authorized, skip cameras refresh")
+            return None
         logger.info("[Refresh] Refreshing cameras from Cloud...")
         try:
             cameras = await self._miot_client.get_cameras_async()
-            cameras = copy.deepcopy(cameras)
-
-            for did, info in cameras.items():
-                if did in self._camera_img_managers:
-                    mgr = self._camera_img_managers[did]
-                    try:
-                        if hasattr(mgr, "miot_camera_instance"):
-                            status = await mgr.miot_camera_instance.get_status_async()
-                            if status.value > 0:
-                                info.online = True
-                                info.camera_status = status
-                    except Exception:
-                        pass
+            # The client keeps this dict as its own buffer and its LAN callbacks keep writing to the models,
+            # so the mapping is copied and entries whose status is overridden below get their own model_copy
+            cameras = dict(cameras)
+
+            # Each probe is a blocking native call run in the executor, query all cameras at once
+            probe_dids = [did for did in cameras if hasattr(self._camera_img_managers.get(did), "miot_camera_instance")]
+            statuses = await asyncio.gather(
+                *(self._camera_img_managers[did].miot_camera_instance.get_status_async() for did in probe_dids),
+                return_exceptions=True)
+            for did, status in zip(probe_dids, statuses):
+                if not isinstance(status, BaseException) and status.value > 0:
+                    cameras[did] = cameras[did].model_copy(update={"online": True, "camera_status": status})
 
             self._camera_info_dict = cameras
-            self._kv_dao.set(DeviceInfoKeys.CAMERA_INFO_KEY, json.dumps(to_jsonable_python(cameras)))
-
-            for did, manager in self._camera_img_managers.items():
-                if did in cameras: await manager.update_camera_info(cameras[did])
-
-            dids_to_remove = []
-            for did in list(self._camera_img_managers.keys()):
-                if did not in cameras:
-                    await self._camera_img_managers[did].destroy()
-                    dids_to_remove.append(did)
-                    if did in self._stream_subscribers: del self._stream_subscribers[did]
-            for k in dids_to_remove: del self._camera_img_managers[k]
-
+            if persist:
+                await self._persist_if_changed(
+                    {DeviceInfoKeys.CAMERA_INFO_KEY: _CAMERA_INFO_ADAPTER.dump_json(cameras)})
+
+            managed_dids = self._camera_img_managers.keys()
+            removed_dids = managed_dids - cameras.keys()
+            # Each camera has its own connection, so update/destroy/create run concurrently
+            jobs = [("update", did, self._update_camera_manager(did, cameras[did]))
+                    for did in managed_dids & cameras.keys()]
+            jobs += [("destroy", did, self._destroy_camera_manager(did)) for did in removed_dids]
             # [关键恢复] 自动保活逻辑
             # 对所有摄像头建立 Low Quality 连接，确保在线状态和缩略图功能
-            for camera_did in cameras.keys():
-                if camera_did not in self._camera_img_managers:
-                    logger.info("[Refresh] Auto-connecting %s (Q=1) for Keep-Alive", camera_did)
-                    await self._create_camera_img_manager(cameras[camera_did], target_quality=1)
-                    if camera_did in self._camera_img_managers:
-                        # 注册主回调以消耗视频数据
-                        await self._camera_img_managers[camera_did].register_raw_stream(self._master_stream_callback, 0)
+            jobs += [("create", did, self._create_keep_alive_manager(cameras[did]))
+                     for did in cameras.keys() - managed_dids]
+            results = await asyncio.gather(*(job for _, _, job in jobs), return_exceptions=True)
+            for (action, did, _), result in zip(jobs, results):
+                if isinstance(result, Exception):
+                    logger.error("[Refresh] Failed to %s camera manager %s: %s", action, did, result)
 
+            for did in removed_dids:
+                self._stream_subscribers.pop(did, None)
+
+            self._notify_refreshed("cameras")
             return cameras
-        except Exception as e:
+        except _TRANSIENT_ERRORS as e:
             logger.error("Failed to refresh cameras: %s", e)
             return None
 
@@ -288,54 +401,93 @@ class MiotProxy:
 
     async def get_devices(self) -> dict[str, MIoTDeviceInfo]:
         if not self._device_info_dict:
-            await self.refresh_devices()
+            await self._refresh_once("devices", self.refresh_devices)
         return self._device_info_dict
 
-    async def refresh_devices(self) -> dict[str, MIoTDeviceInfo] | None:
+    async def refresh_devices(self, persist: bool = True) -> dict[str, MIoTDeviceInfo] | None:
+        if self._oauth_info is None:
+            logger.debug("MiOT not authorized, skip devices refresh")
+            return None
         devices = await self._miot_client.get_devices_async()
         self._device_info_dict = devices
-        self._kv_dao.set(DeviceInfoKeys.DEVICE_INFO_KEY, json.dumps(to_jsonable_python(devices)))
+        if persist:
+            await self._persist_if_changed({DeviceInfoKeys.DEVICE_INFO_KEY: _DEVICE_INFO_ADAPTER.dump_json(devices)})
+        self._notify_refreshed("devices")
         return devices
 
-    async def refresh_scenes(self) -> dict[str, MIoTManualSceneInfo] | None:
+    async def refresh_scenes(self, persist: bool = True) -> dict[str, MIoTManualSceneInfo] | None:
+        if self._oauth_info is None:
+            logger.debug("MiOT not authorized, skip scenes refresh")
+            return None
         scenes = await self._miot_client.get_manual_scenes_async()
         self._scene_info_dict = scenes
-        self._kv_dao.set(DeviceInfoKeys.SCENE_INFO_KEY, json.dumps(to_jsonable_python(scenes)))
+        if persist:
+            await self._persist_if_changed({DeviceInfoKeys.SCENE_INFO_KEY: _SCENE_INFO_ADAPTER.dump_json(scenes)})
+        self._notify_refreshed("scenes")
         return scenes
 
     async def get_all_scenes(self) -> dict[str, MIoTManualSceneInfo]:
         if not self._scene_info_dict:
-            await self.refresh_scenes()
+            await self._refresh_once("scenes", self.refresh_scenes)
         return self._scene_info_dict
 
-    async def refresh_user_info(self):
+    async def refresh_user_info(self, persist: bool = True):
+        if self._oauth_info is None:
+            logger.debug("MiOT not authorized, skip user info refresh")
+            return None
         user_info = await self._miot_client.get_user_info_async()
         self._user_info = user_info
-        self._kv_dao.set(DeviceInfoKeys.USER_INFO_KEY, json.dumps(to_jsonable_python(user_info)))
+        if persist:
+            await self._persist_if_changed({DeviceInfoKeys.USER_INFO_KEY: _USER_INFO_ADAPTER.dump_json(user_info)})
+        self._notify_refreshed("user_info")
         return user_info
 
+    def add_refresh_listener(self, listener: Callable[[str], None]):
+        self._refresh_listeners.append(listener)
+
+    def _notify_refreshed(self, name: str):
+        for listener in self._refresh_listeners:
+            try:
+                listener(name)
+            except Exception as e:
+                logger.error("Refresh listener failed for %s: %s", name, e)
+
     async def get_user_info(self) -> Optional[MIoTUserInfo]:
         if not self._user_info:
-            await self.refresh_user_info()
+            await self._refresh_once("user_info", self.refresh_user_info)
         return self._user_info
 
     async def _start_token_refresh_task(self):
         while True:
             try:
-                await asyncio.sleep(300)
+                # Sleep until the refresh deadline instead of polling; without a token wait for a login
+                delay = None
+                if self._oauth_info:
+                    delay = min(self._TOKEN_REFRESH_MAX_INTERVAL, max(
+                        self._TOKEN_REFRESH_MIN_INTERVAL,
+                        self._oauth_info.expires_ts - int(time.time()) - self._TOKEN_REFRESH_AHEAD))
+                self._token_refresh_wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._token_refresh_wakeup.wait(), timeout=delay)
+                    continue
+                except asyncio.TimeoutError:
+                    pass
                 await self._check_and_refresh_token()
             except Exception as e:
-                logger.error(f"Token refresh task error: {e}")
+                logger.error("Token refresh task error: %s", e)
                 await asyncio.sleep(60)
 
     async def _check_and_refresh_token(self):
-        if self._oauth_info and self._oauth_info.expires_ts - int(time.time()) <= 1800:
+        if self._oauth_info and self._oauth_info.expires_ts - int(time.time()) <= self._TOKEN_REFRESH_AHEAD:
             await self.refresh_xiaomi_home_token_info()
 
     async def execute_miot_scene(self, scene_id):
-        if scene_id not in self._scene_info_dict: await self.refresh_scenes()
-        if scene_id in self._scene_info_dict:
-            return await self._miot_client.run_manual_scene_async(self._scene_info_dict[scene_id])
+        scene_info = self._scene_info_dict.get(scene_id)
+        if scene_info is None:
+            await self.refresh_scenes()
+            scene_info = self._scene_info_dict.get(scene_id)
+        if scene_info is not None:
+            return await self._miot_client.run_manual_scene_async(scene_info)
         return False
 
     async def send_app_notify(self, nid):
@@ -360,6 +512,7 @@ class MiotProxy:
         self._oauth_info = info
         self._kv_dao.set(AuthConfigKeys.MIOT_TOKEN_INFO_KEY, info.model_dump_json())
         if self._miot_client.http_client: self._miot_client.http_client.access_token = info.access_token
+        self._token_refresh_wakeup.set()
 
     async def refresh_xiaomi_home_token_info(self) -> MIoTOauthInfo:
             try:
@@ -368,7 +521,8 @@ class MiotProxy:
                 oauth_info = await self._miot_client.refresh_access_token_async(
                     refresh_token=self._oauth_info.refresh_token
                 )
-                logger.info("Successfully refreshed Xiaomi home token info: %s", oauth_info)
+                # Only the expiry is logged: the model repr walks every field and contains the tokens
+                logger.info("Successfully refreshed Xiaomi home token info, expires_ts: %s", oauth_info.expires_ts)
                 self.reset_miot_token_info(oauth_info)
                 await asyncio.sleep(3)
                 await self.refresh_miot_info()
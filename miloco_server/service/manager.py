@@ -74,7 +74,7 @@ class Manager:
             logger.debug("Manager already initialized, skipping duplicate initialization")
             return
 
-        logger.info(f"Manager initialization started (Lite Mode: {LITE_MODE})")
+        logger.info("Manager initialization started (Lite Mode: %s)", LITE_MODE)
 
         self._initialized = True
 
@@ -216,6 +216,10 @@ class Manager:
     def default_preset_action_manager(self) -> Optional[DefaultPresetActionManager]:
         return self._default_preset_action_manager
 
+    @property
+    def trigger_rule_runner(self) -> Optional[TriggerRuleRunner]:
+        return self._trigger_rule_runner
+
     def get_llm_proxy_by_purpose(self, purpose: ModelPurpose) -> Optional[LLMProxy]:
         # [Fix] Lite Mode protection
         if not self._model_service:
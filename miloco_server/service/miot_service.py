@@ -5,6 +5,7 @@
 MiOT service module
 """
 
+import asyncio
 import logging
 from typing import List, Optional, Callable, Coroutine
 
@@ -35,11 +36,30 @@ class MiotService:
         self._mcp_client_manager = mcp_client_manager
         self._default_preset_action_manager = default_preset_action_manager
         self._streamers: dict[str, FFmpegStreamer] = {}
+        # FFmpegStreamer.start drops a call that overlaps another start, so off-loop starts go one at a time
+        self._streamer_start_lock = asyncio.Lock()
 
     @property
     def miot_client(self):
         return self._miot_proxy.miot_client
 
+    def add_refresh_listener(self, listener: Callable[[str], None]):
+        """Register a callback invoked with the info name after each successful MiOT refresh"""
+        self._miot_proxy.add_refresh_listener(listener)
+
+    async def _start_streamer(self, camera_id: str) -> FFmpegStreamer:
+        """Replace the camera's RTSP streamer with a freshly started one"""
+        # FFmpegStreamer start/stop sleep and wait on the ffmpeg process, keep them off the event loop
+        old_streamer = self._streamers.pop(camera_id, None)
+        if old_streamer:
+            await asyncio.to_thread(old_streamer.stop)
+
+        streamer = FFmpegStreamer(camera_id)
+        async with self._streamer_start_lock:
+            await asyncio.to_thread(streamer.start, video_codec="hevc")
+        self._streamers[camera_id] = streamer
+        return streamer
+
     async def start_video_stream(self, camera_id: str, channel: int,
                                  callback: Callable[..., Coroutine] = None,
                                  video_quality: int = 2):
@@ -49,10 +69,10 @@ class MiotService:
         - Audio: Decoded PCM (via internal decoder)
         """
         try:
-            logger.info(f"Starting RTSP Service for {camera_id} (Q={video_quality})...")
+            logger.info("Starting RTSP Service for %s (Q=%s)...", camera_id, video_quality)
 
             # 1. 焦土政策：销毁旧实例，确保环境纯净
-            logger.info(f"Force destroying proxy for {camera_id}...")
+            logger.info("Force destroying proxy for %s...", camera_id)
             await self._miot_proxy.destroy_camera_proxy(camera_id)
 
             # 创建新实例
@@ -62,12 +82,7 @@ class MiotService:
                 raise MiotServiceException(f"Camera instance not found: {camera_id}")
 
             # 2. 启动 Streamer (PCM 输入模式)
-            if camera_id in self._streamers:
-                self._streamers[camera_id].stop()
-
-            streamer = FFmpegStreamer(camera_id)
-            streamer.start(video_codec="hevc")
-            self._streamers[camera_id] = streamer
+            streamer = await self._start_streamer(camera_id)
 
             # 3. 清理旧回调
             try:
@@ -121,21 +136,21 @@ class MiotService:
             # 6. 启动摄像头
             await camera_instance.start_async(qualities=video_quality, enable_audio=True, enable_reconnect=True)
 
-            logger.info(f"RTSP Streamer active (Hybrid Mode): {streamer.rtsp_url}")
+            logger.info("RTSP Streamer active (Hybrid Mode): %s", streamer.rtsp_url)
 
         except Exception as e:
-            logger.error(f"Failed to start video stream: {e}", exc_info=True)
+            logger.error("Failed to start video stream: %s", e, exc_info=True)
             raise MiotServiceException(f"Stream start error: {str(e)}") from e
 
     async def stop_video_stream(self, camera_id: str, channel: int, video_quality: int = None):
         try:
-            logger.info(f"Stopping RTSP Service for {camera_id}...")
-            if camera_id in self._streamers:
-                self._streamers[camera_id].stop()
-                del self._streamers[camera_id]
+            logger.info("Stopping RTSP Service for %s...", camera_id)
+            streamer = self._streamers.pop(camera_id, None)
+            if streamer:
+                await asyncio.to_thread(streamer.stop)
             # 必须销毁实例以停止内部解码线程
             await self._miot_proxy.destroy_camera_proxy(camera_id)
-            logger.info(f"Stream stopped for {camera_id}")
+            logger.info("Stream stopped for %s", camera_id)
         except Exception as e:
             logger.error("Failed to stop video stream: %s", e)
 
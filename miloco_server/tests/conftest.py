@@ -0,0 +1,19 @@
+# Copyright (C) 2025 Xiaomi Corporation
+# This software may be used and distributed according to the terms of the Xiaomi Miloco License Agreement.
+
+"""
+Shared fixtures for miloco_server tests.
+"""
+# pylint: disable=missing-function-docstring
+import pytest
+
+from miloco_server.dao.kv_dao import KVDao
+from miloco_server.utils import database
+
+
+@pytest.fixture
+def kv_dao(tmp_path, monkeypatch):
+    monkeypatch.setitem(database.DATABASE_CONFIG, "path", tmp_path / "miloco.db")
+    monkeypatch.setattr(database, "db_connector", None)
+    database.init_database()
+    return KVDao()
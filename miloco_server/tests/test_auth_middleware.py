@@ -0,0 +1,67 @@
+# Copyright (C) 2025 Xiaomi Corporation
+# This software may be used and distributed according to the terms of the Xiaomi Miloco License Agreement.
+
+"""
+Unit test for auth_middleware.py verified token cache.
+"""
+# pylint: disable=missing-function-docstring, protected-access
+import time
+
+import pytest
+
+from miloco_server.middleware import auth_middleware
+from miloco_server.middleware.auth_middleware import (
+    ADMIN_USERNAME,
+    _verify_jwt_token_internal,
+    create_access_token,
+    invalidate_all_tokens,
+    token_fingerprint,
+)
+from miloco_server.middleware.exceptions import AuthenticationException
+
+
+@pytest.fixture(autouse=True)
+def _fresh_token_state(monkeypatch):
+    # Tokens issued in the same second as the module import would otherwise count as invalidated
+    monkeypatch.setattr(auth_middleware, "token_invalidation_time", int(time.time()) - 10)
+    auth_middleware._token_cache.clear()
+    yield
+    auth_middleware._token_cache.clear()
+
+
+def test_verified_token_is_cached_by_digest():
+    token = create_access_token(ADMIN_USERNAME)
+
+    assert _verify_jwt_token_internal(token) == ADMIN_USERNAME
+    assert token not in auth_middleware._token_cache
+    assert token_fingerprint(token) in auth_middleware._token_cache
+    assert _verify_jwt_token_internal(token) == ADMIN_USERNAME
+
+
+def test_logout_rejects_cached_token():
+    token = create_access_token(ADMIN_USERNAME)
+    _verify_jwt_token_internal(token)
+
+    invalidate_all_tokens()
+
+    with pytest.raises(AuthenticationException):
+        _verify_jwt_token_internal(token)
+
+
+def test_logout_racing_verify_does_not_revive_token(monkeypatch):
+    token = create_access_token(ADMIN_USERNAME)
+    is_token_valid = auth_middleware.is_token_valid
+
+    def _valid_then_logout(token_issued_at):
+        # Logout lands after the validity check but before the cache write
+        valid = is_token_valid(token_issued_at)
+        invalidate_all_tokens()
+        return valid
+
+    monkeypatch.setattr(auth_middleware, "is_token_valid", _valid_then_logout)
+    assert _verify_jwt_token_internal(token) == ADMIN_USERNAME
+    assert token_fingerprint(token) in auth_middleware._token_cache
+
+    monkeypatch.setattr(auth_middleware, "is_token_valid", is_token_valid)
+    with pytest.raises(AuthenticationException):
+        _verify_jwt_token_internal(token)
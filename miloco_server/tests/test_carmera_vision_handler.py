@@ -0,0 +1,51 @@
+# Copyright (C) 2025 Xiaomi Corporation
+# This software may be used and distributed according to the terms of the Xiaomi Miloco License Agreement.
+
+"""
+Unit test for carmera_vision_handler.py SizeLimitedQueue.
+"""
+# pylint: disable=missing-function-docstring
+import pytest
+
+from miloco_server.utils import carmera_vision_handler
+from miloco_server.utils.carmera_vision_handler import SizeLimitedQueue
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake_clock = _Clock()
+    monkeypatch.setattr(carmera_vision_handler.time, "time", fake_clock)
+    return fake_clock
+
+
+def test_get_recent_returns_newest_in_order(clock):
+    queue = SizeLimitedQueue(max_size=3, ttl=10)
+    for item in range(5):
+        queue.put(item)
+        clock.now += 1
+
+    assert queue.get_recent(2) == [3, 4]
+    # The deque's maxlen keeps only the newest max_size items
+    assert queue.get_recent(10) == [2, 3, 4]
+    assert queue.get_recent(0) == []
+
+
+def test_get_recent_stops_at_first_expired_item(clock):
+    queue = SizeLimitedQueue(max_size=5, ttl=10)
+    queue.put("old")
+    clock.now += 8
+    queue.put("mid")
+    clock.now += 4
+    queue.put("new")
+
+    assert queue.get_recent(5) == ["mid", "new"]
+    clock.now += 20
+    assert queue.get_recent(5) == []
@@ -0,0 +1,38 @@
+# Copyright (C) 2025 Xiaomi Corporation
+# This software may be used and distributed according to the terms of the Xiaomi Miloco License Agreement.
+
+"""
+Unit test for kv_dao.py.
+"""
+# pylint: disable=missing-function-docstring
+import sqlite3
+
+from miloco_server.dao.kv_dao import KVDao
+
+
+def test_set_many_round_trip(kv_dao):
+    kv_dao.set("a", "old")
+    assert kv_dao.set_many({"a": "1", "b": "2"}) is True
+
+    assert kv_dao.get("a") == "1"
+    assert kv_dao.get("b") == "2"
+    # A fresh DAO reads from SQLite, not from the in-memory cache
+    assert KVDao().get_all() == {"a": "1", "b": "2"}
+
+
+def test_set_many_empty_is_noop(kv_dao):
+    assert kv_dao.set_many({}) is True
+    assert kv_dao.get_all() == {}
+
+
+def test_set_many_failure_leaves_cache_untouched(kv_dao, monkeypatch):
+    kv_dao.set("a", "old")
+
+    def _locked(query, params_list):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(kv_dao.db_connector, "execute_many", _locked)
+    assert kv_dao.set_many({"a": "1", "b": "2"}) is False
+
+    assert kv_dao.get("a") == "old"
+    assert "b" not in kv_dao.get_all()
@@ -0,0 +1,234 @@
+# Copyright (C) 2025 Xiaomi Corporation
+# This software may be used and distributed according to the terms of the Xiaomi Miloco License Agreement.
+
+"""
+Unit test for miot_controller.py caching helpers and video stream manager.
+"""
+# pylint: disable=missing-function-docstring, protected-access, redefined-outer-name
+import asyncio
+import json
+import logging
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Request
+from fastapi.websockets import WebSocketState
+
+from miloco_server.controller import miot_controller
+from miloco_server.controller.miot_controller import (
+    MIoTVideoStreamManager,
+    _revalidatable_response,
+    _single_flight,
+    _SWRCache,
+)
+
+
+class _Counter:
+    """Async fetch that returns an increasing value per call."""
+
+    def __init__(self, delay: float = 0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.calls
+
+
+class _FakeWebSocket:
+    def __init__(self, close_gate: asyncio.Event | None = None):
+        self.client_state = WebSocketState.CONNECTED
+        self.close_code = None
+        self.sent = []
+        self._close_gate = close_gate
+
+    async def send_bytes(self, data: bytes):
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000, reason: str | None = None):
+        if self._close_gate is not None:
+            await self._close_gate.wait()
+        self.client_state = WebSocketState.DISCONNECTED
+        self.close_code = code
+
+
+class _FakeMiotService:
+    def __init__(self):
+        self.calls = []
+        self.start_error = None
+
+    async def start_video_stream(self, camera_id, channel, callback=None, video_quality=2):
+        self.calls.append("start")
+        await asyncio.sleep(0)
+        if self.start_error is not None:
+            raise self.start_error
+
+    async def stop_video_stream(self, camera_id, channel, video_quality=None):
+        self.calls.append("stop")
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def miot_service(monkeypatch):
+    service = _FakeMiotService()
+    monkeypatch.setattr(miot_controller, "manager", SimpleNamespace(miot_service=service))
+    return service
+
+
+async def _settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def _request(headers: dict) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [(key.encode(), value.encode()) for key, value in headers.items()],
+    })
+
+
+@pytest.mark.asyncio
+async def test_swr_cache_serves_fresh_then_stale_while_revalidating():
+    cache = _SWRCache(ttl=0.05, stale_ttl=10)
+    fetch = _Counter()
+
+    assert await cache.get("k", fetch) == 1
+    assert await cache.get("k", fetch) == 1
+    assert fetch.calls == 1
+
+    await asyncio.sleep(0.06)
+    # Stale: the old value is returned at once and a background revalidation is started
+    assert await cache.get("k", fetch) == 1
+    await _settle()
+    assert fetch.calls == 2
+    assert await cache.get("k", fetch) == 2
+
+
+@pytest.mark.asyncio
+async def test_swr_cache_blocks_when_expired_and_after_invalidate():
+    cache = _SWRCache(ttl=0.02, stale_ttl=0.02)
+    fetch = _Counter()
+
+    assert await cache.get("k", fetch) == 1
+    await asyncio.sleep(0.05)
+    assert await cache.get("k", fetch) == 2
+
+    cache.invalidate("k")
+    assert await cache.get("k", fetch) == 3
+
+
+@pytest.mark.asyncio
+async def test_single_flight_coalesces_concurrent_callers():
+    fetch = _Counter(delay=0.01)
+    results = await asyncio.gather(*(_single_flight("refresh", fetch) for _ in range(5)))
+    assert results == [1] * 5
+    assert fetch.calls == 1
+    assert "refresh" not in miot_controller._inflight_refreshes
+
+
+def test_revalidatable_response_returns_304_on_matching_etag():
+    response = _revalidatable_response(_request({}), "ok", {"a": 1})
+    assert response.status_code == 200
+    assert json.loads(response.body)["data"] == {"a": 1}
+    etag = response.headers["etag"]
+
+    not_modified = _revalidatable_response(_request({"if-none-match": etag}), "ok", {"a": 1})
+    assert not_modified.status_code == 304
+    assert not_modified.headers["etag"] == etag
+
+    changed = _revalidatable_response(_request({"if-none-match": etag}), "ok", {"a": 2})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_refresh_listener_invalidates_derived_keys(monkeypatch):
+    cache = _SWRCache(ttl=60, stale_ttl=60)
+    monkeypatch.setattr(miot_controller, "_miot_cache", cache)
+    cameras, devices = _Counter(), _Counter()
+    await cache.get("camera_list", cameras)
+    await cache.get("device_list", devices)
+
+    miot_controller.on_miot_info_refreshed("cameras")
+    miot_controller.on_miot_info_refreshed("unknown")
+
+    assert await cache.get("camera_list", cameras) == 2
+    assert await cache.get("device_list", devices) == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_endpoints_log_at_info_and_reads_at_debug(monkeypatch, caplog):
+    async def _ok():
+        return True
+
+    service = SimpleNamespace(refresh_miot_cameras=_ok, get_miot_login_status=_ok)
+    monkeypatch.setattr(miot_controller, "manager", SimpleNamespace(miot_service=service))
+    caplog.set_level(logging.DEBUG, logger=miot_controller.logger.name)
+
+    await miot_controller.refresh_miot_cameras(current_user="admin")
+    await miot_controller.get_miot_login_status(current_user="admin")
+
+    levels = {record.getMessage(): record.levelno for record in caplog.records}
+    assert levels["Refresh MiOT cameras API called, user: admin"] == logging.INFO
+    assert levels["MiOT login status API called, user: admin"] == logging.DEBUG
+
+
+@pytest.mark.asyncio
+async def test_stream_start_failure_closes_viewers_and_allows_retry(miot_service):
+    stream_manager = MIoTVideoStreamManager()
+    miot_service.start_error = RuntimeError("boom")
+    websocket = _FakeWebSocket()
+
+    await stream_manager.new_connection(websocket, "admin", "t", "did", 0, 1)
+    await _settle()
+
+    assert websocket.close_code == 1011
+    assert not stream_manager._camera_index
+    assert not stream_manager._start_tasks
+    assert not stream_manager._connections
+
+    miot_service.start_error = None
+    await stream_manager.new_connection(_FakeWebSocket(), "admin", "t", "did", 0, 1)
+    await _settle()
+    assert miot_service.calls == ["start", "start"]
+
+
+@pytest.mark.asyncio
+async def test_reconnect_during_last_viewer_close_is_not_torn_down(miot_service):
+    stream_manager = MIoTVideoStreamManager()
+    camera_tag = ("did", 0, 1)
+    close_gate = asyncio.Event()
+    first_cid = await stream_manager.new_connection(_FakeWebSocket(close_gate), "admin", "t", *camera_tag)
+    await _settle()
+
+    # The last viewer leaves and stalls in websocket.close(); a new viewer arrives meanwhile
+    closing = asyncio.create_task(stream_manager.close_connection(first_cid))
+    await _settle()
+    second_ws = _FakeWebSocket()
+    second_cid = await stream_manager.new_connection(second_ws, "admin", "t", *camera_tag)
+    new_start = stream_manager._start_tasks[camera_tag]
+
+    close_gate.set()
+    await closing
+    await new_start
+
+    # The old stream is stopped before the new one starts, and the new viewer stays registered
+    assert miot_service.calls == ["start", "stop", "start"]
+    assert list(stream_manager._camera_index[camera_tag]) == [second_cid]
+    assert stream_manager._start_tasks[camera_tag] is new_start
+    assert second_ws.close_code is None
+
+
+@pytest.mark.asyncio
+async def test_user_connection_limit_evicts_oldest(miot_service):
+    stream_manager = MIoTVideoStreamManager()
+    websockets = [_FakeWebSocket() for _ in range(MIoTVideoStreamManager._CAMERA_CONNECT_COUNT_MAX + 1)]
+    cids = [await stream_manager.new_connection(ws, "admin", "t", "did", 0, 1) for ws in websockets]
+    await _settle()
+
+    assert websockets[0].close_code == 1000
+    assert cids[0] not in stream_manager._connections
+    assert list(stream_manager._camera_index[("did", 0, 1)]) == cids[1:]
+    assert miot_service.calls == ["start"]
@@ -0,0 +1,261 @@
+# Copyright (C) 2025 Xiaomi Corporation
+# This software may be used and distributed according to the terms of the Xiaomi Miloco License Agreement.
+
+"""
+Unit test for miot_proxy.py.
+"""
+# pylint: disable=missing-function-docstring, protected-access, redefined-outer-name
+import asyncio
+import contextlib
+import sqlite3
+import time
+from types import SimpleNamespace
+
+import pytest
+from miot.types import MIoTUserInfo
+
+from miloco_server.dao.kv_dao import DeviceInfoKeys, KVDao
+from miloco_server.proxy import miot_proxy
+from miloco_server.proxy.miot_proxy import MiotProxy
+
+
+class _FakeMIoTClient:
+    def __init__(self, **kwargs):
+        self.cameras = {}
+        self.devices = {}
+        self.scenes = {}
+        self.user_info = None
+
+    async def get_cameras_async(self):
+        return self.cameras
+
+    async def get_devices_async(self):
+        return self.devices
+
+    async def get_manual_scenes_async(self):
+        return self.scenes
+
+    async def get_user_info_async(self):
+        return self.user_info
+
+
+@pytest.fixture
+def proxy(kv_dao, monkeypatch):
+    monkeypatch.setattr(miot_proxy, "MIoTClient", _FakeMIoTClient)
+    return MiotProxy(uuid="test", redirect_uri="http://127.0.0.1", kv_dao=kv_dao)
+
+
+def _record_set_many(kv_dao, monkeypatch) -> list:
+    calls = []
+    set_many = kv_dao.set_many
+
+    def _set_many(items):
+        calls.append(dict(items))
+        return set_many(items)
+
+    monkeypatch.setattr(kv_dao, "set_many", _set_many)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_persist_skips_unchanged_and_batches_changed(proxy, kv_dao, monkeypatch):
+    calls = _record_set_many(kv_dao, monkeypatch)
+
+    await proxy._persist_if_changed({"a": b"1", "b": b"2"})
+    await proxy._persist_if_changed({"a": b"1", "b": b"2"})
+    await proxy._persist_if_changed({"a": b"1", "b": b"3"})
+
+    assert calls == [{"a": "1", "b": "2"}, {"b": "3"}]
+    assert KVDao().get_all() == {"a": "1", "b": "3"}
+
+
+@pytest.mark.asyncio
+async def test_failed_persist_is_retried_on_next_refresh(proxy, kv_dao, monkeypatch):
+    execute_many = kv_dao.db_connector.execute_many
+    failures = [sqlite3.OperationalError("database is locked")]
+
+    def _flaky(query, params_list):
+        if failures:
+            raise failures.pop()
+        return execute_many(query, params_list)
+
+    monkeypatch.setattr(kv_dao.db_connector, "execute_many", _flaky)
+
+    await proxy._persist_if_changed({"a": b"1"})
+    assert kv_dao.get("a") is None
+    await proxy._persist_if_changed({"a": b"1"})
+    assert KVDao().get_all() == {"a": "1"}
+
+
+@pytest.mark.asyncio
+async def test_refresh_miot_info_succeeds_when_persist_fails(proxy, kv_dao, monkeypatch):
+    def _locked(query, params_list):
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(kv_dao.db_connector, "execute_many", _locked)
+    proxy._oauth_info = SimpleNamespace(expires_ts=0)
+    proxy.miot_client.devices = {}
+
+    result = await proxy.refresh_miot_info()
+
+    assert result == {"cameras": True, "scenes": True, "user_info": False, "devices": True}
+    assert DeviceInfoKeys.DEVICE_INFO_KEY not in kv_dao.get_all()
+
+
+async def _run_token_refresh_loop(proxy, duration: float):
+    task = asyncio.create_task(proxy._start_token_refresh_task())
+    await asyncio.sleep(duration)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.asyncio
+async def test_token_refresh_sleep_is_capped(proxy, monkeypatch):
+    timeouts = []
+    wait_for = asyncio.wait_for
+
+    async def _wait_for(awaitable, timeout):
+        timeouts.append(timeout)
+        return await wait_for(awaitable, timeout=0.01)
+
+    monkeypatch.setattr(miot_proxy.asyncio, "wait_for", _wait_for)
+    proxy._oauth_info = SimpleNamespace(expires_ts=int(time.time()) + 30 * 24 * 3600)
+
+    await _run_token_refresh_loop(proxy, 0.05)
+
+    assert timeouts
+    assert all(timeout == MiotProxy._TOKEN_REFRESH_MAX_INTERVAL for timeout in timeouts)
+
+
+@pytest.mark.asyncio
+async def test_token_refresh_fires_near_expiry_and_waits_for_login(proxy, monkeypatch):
+    refreshed = []
+
+    async def _refresh():
+        refreshed.append(time.time())
+        proxy._oauth_info = SimpleNamespace(expires_ts=int(time.time()) + 30 * 24 * 3600)
+
+    monkeypatch.setattr(proxy, "refresh_xiaomi_home_token_info", _refresh)
+    monkeypatch.setattr(proxy, "_TOKEN_REFRESH_MIN_INTERVAL", 0.01)
+    monkeypatch.setattr(proxy, "_TOKEN_REFRESH_MAX_INTERVAL", 0.01)
+
+    # Without a token the loop waits for a login instead of polling
+    task = asyncio.create_task(proxy._start_token_refresh_task())
+    await asyncio.sleep(0.05)
+    assert not refreshed
+
+    proxy._oauth_info = SimpleNamespace(expires_ts=int(time.time()) + 60)
+    proxy._token_refresh_wakeup.set()
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+
+    # Refreshed once; the new far-off expiry is only re-checked afterwards
+    assert len(refreshed) == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_writes_kv_only_when_info_changes(proxy, kv_dao, monkeypatch):
+    calls = _record_set_many(kv_dao, monkeypatch)
+    proxy._oauth_info = SimpleNamespace(expires_ts=0)
+
+    proxy.miot_client.user_info = MIoTUserInfo(uid="1", nickname="a", icon="", union_id="u")
+    await proxy.refresh_user_info()
+    await proxy.refresh_user_info()
+    proxy.miot_client.user_info = MIoTUserInfo(uid="1", nickname="b", icon="", union_id="u")
+    await proxy.refresh_user_info()
+
+    assert [list(items) for items in calls] == [[DeviceInfoKeys.USER_INFO_KEY]] * 2
+    # The TypeAdapter output loads back through init_miot_info_dict
+    reloaded = MiotProxy(uuid="test", redirect_uri="http://127.0.0.1", kv_dao=KVDao())
+    assert reloaded._user_info == proxy.miot_client.user_info
+
+
+class _FakeVisionHandler:
+    def __init__(self, events: list, name: str, barrier: asyncio.Barrier | None = None, error=None):
+        self.events = events
+        self.name = name
+        self.barrier = barrier
+        self.error = error
+
+    async def _step(self, action: str):
+        self.events.append(f"{action}:{self.name}:start")
+        if self.barrier is not None:
+            await asyncio.wait_for(self.barrier.wait(), timeout=1)
+        else:
+            await asyncio.sleep(0.01)
+        self.events.append(f"{action}:{self.name}:end")
+        if self.error is not None:
+            raise self.error
+
+    async def update_camera_info(self, camera_info):
+        await self._step("update")
+
+    async def destroy(self):
+        await self._step("destroy")
+
+    async def register_raw_stream(self, callback, channel):
+        pass
+
+
+def _fake_create_manager(proxy, events: list, barrier: asyncio.Barrier | None = None) -> list:
+    created = []
+
+    async def _create(camera_info, target_quality=None):
+        created.append(camera_info.did)
+        manager = _FakeVisionHandler(events, camera_info.did, barrier)
+        await manager._step("create")
+        proxy._camera_img_managers[camera_info.did] = manager
+        return manager
+
+    proxy._create_camera_img_manager = _create
+    return created
+
+
+@pytest.mark.asyncio
+async def test_refresh_cameras_reconciles_managers_concurrently(proxy):
+    events = []
+    # All three jobs must be in flight together to pass the barrier
+    barrier = asyncio.Barrier(3)
+    proxy._oauth_info = SimpleNamespace(expires_ts=0)
+    proxy._camera_img_managers = {
+        "kept": _FakeVisionHandler(events, "kept", barrier, error=RuntimeError("update failed")),
+        "removed": _FakeVisionHandler(events, "removed", barrier),
+    }
+    created = _fake_create_manager(proxy, events, barrier)
+    proxy.miot_client.cameras = {"kept": SimpleNamespace(did="kept"), "new": SimpleNamespace(did="new")}
+
+    cameras = await proxy.refresh_cameras(persist=False)
+
+    assert set(cameras) == {"kept", "new"}
+    assert created == ["new"]
+    # The failed update is logged and does not stop the destroy and create
+    assert set(proxy._camera_img_managers) == {"kept", "new"}
+    assert events.index("create:new:end") > max(
+        events.index("update:kept:start"), events.index("destroy:removed:start"))
+
+
+@pytest.mark.asyncio
+async def test_concurrent_create_camera_proxy_builds_one_manager(proxy):
+    events = []
+    created = _fake_create_manager(proxy, events)
+    proxy._camera_info_dict = {"cam": SimpleNamespace(did="cam")}
+
+    await asyncio.gather(proxy.create_camera_proxy("cam"), proxy.create_camera_proxy("cam"))
+
+    assert created == ["cam"]
+
+
+@pytest.mark.asyncio
+async def test_destroy_waits_for_in_flight_update_of_same_camera(proxy):
+    events = []
+    proxy._camera_img_managers = {"cam": _FakeVisionHandler(events, "cam")}
+
+    await asyncio.gather(
+        proxy._update_camera_manager("cam", SimpleNamespace(did="cam")),
+        proxy.destroy_camera_proxy("cam"))
+
+    assert events == ["update:cam:start", "update:cam:end", "destroy:cam:start", "destroy:cam:end"]
+    assert "cam" not in proxy._camera_img_managers
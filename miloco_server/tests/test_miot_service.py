@@ -0,0 +1,57 @@
+# Copyright (C) 2025 Xiaomi Corporation
+# This software may be used and distributed according to the terms of the Xiaomi Miloco License Agreement.
+
+"""
+Unit test for miot_service.py.
+"""
+# pylint: disable=missing-function-docstring, protected-access
+import asyncio
+
+import pytest
+
+from miloco_server.service.miot_service import MiotService
+from miloco_server.utils import ffmpeg_streamer
+from miloco_server.utils.ffmpeg_streamer import FFmpegStreamer
+
+
+class _FakePipeWriter:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def write_direct(self, data: bytes):
+        pass
+
+    def close(self):
+        pass
+
+
+class _FakeProcess:
+    def terminate(self):
+        pass
+
+    def wait(self, timeout=None):
+        return 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_streamer_starts_each_get_a_process(monkeypatch):
+    popen_calls = []
+
+    def _popen(cmd, **kwargs):
+        popen_calls.append(cmd[-1])
+        return _FakeProcess()
+
+    monkeypatch.setattr(ffmpeg_streamer, "PipeWriter", _FakePipeWriter)
+    monkeypatch.setattr(ffmpeg_streamer.subprocess, "Popen", _popen)
+    monkeypatch.setattr(FFmpegStreamer, "_force_kill_zombies", lambda self: None)
+    monkeypatch.setattr(FFmpegStreamer, "_monitor_ffmpeg", lambda self: None)
+    monkeypatch.setattr(FFmpegStreamer, "_global_cooldown_until", 0)
+
+    service = MiotService(miot_proxy=None, mcp_client_manager=None)
+    streamer_a, streamer_b = await asyncio.gather(
+        service._start_streamer("camA"), service._start_streamer("camB"))
+
+    assert streamer_a.process is not None
+    assert streamer_b.process is not None
+    assert len(popen_calls) == 2
+    assert service._streamers == {"camA": streamer_a, "camB": streamer_b}
@@ -46,8 +46,8 @@ class SizeLimitedQueue:
 
     def put(self, item: Any) -> None:
         """Add element, automatically removes oldest element if queue is full"""
+        # Called per frame; the deque's maxlen already bounds memory, expired items are skipped on read
         with self._lock:
-            self._filter_old_items()
             self.queue.append((item, time.time()))
 
     def get(self) -> Any:
@@ -106,13 +106,17 @@ class SizeLimitedQueue:
         if n <= 0:
             return []
 
+        recent_items = []
         with self._lock:
-            # Get the most recent n elements, starting from the tail of the queue
-            self._filter_old_items()
-            actual_n = min(n, len(self.queue))
-            # Use negative indexing to get from the end of the queue, maintaining order from old to new
-            recent_items = [item[0] for item in self.queue][-actual_n:]
-            return recent_items
+            # Walk back from the tail of the queue, only the n newest unexpired items are touched
+            current_time = time.time()
+            for item, timestamp in reversed(self.queue):
+                if len(recent_items) == n or current_time - timestamp > self.ttl:
+                    break
+                recent_items.append(item)
+        # Restore order from old to new
+        recent_items.reverse()
+        return recent_items
 
 
 class CameraVisionHandler:
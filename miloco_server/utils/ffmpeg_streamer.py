@@ -50,7 +50,7 @@ class PipeWriter:
                 pass
             return True
         except Exception as e:
-            logger.error(f"[{self.name}] Pipe error: {e}")
+            logger.error("[%s] Pipe error: %s", self.name, e)
             return False
 
     def write_direct(self, data: bytes):
@@ -122,7 +122,7 @@ class FFmpegStreamer:
             common_opts = ['-bf', '0']
 
             if hw_accel in ["intel", "amd", "vaapi"]:
-                logger.info(f"FFmpeg Mode: Hybrid Low Latency ({self.camera_id})")
+                logger.info("FFmpeg Mode: Hybrid Low Latency (%s)", self.camera_id)
                 global_args = [
                     '-init_hw_device', f'vaapi=va:{hw_device}',
                     '-filter_hw_device', 'va'
@@ -140,7 +140,7 @@ class FFmpegStreamer:
                 ] + common_opts
 
             elif hw_accel in ["nvidia", "nvenc", "cuda"]:
-                logger.info(f"FFmpeg Mode: Hybrid Low Latency (NVENC) ({self.camera_id})")
+                logger.info("FFmpeg Mode: Hybrid Low Latency (NVENC) (%s)", self.camera_id)
                 video_out_args = [
                     '-c:v', 'h264_nvenc', 
                     '-preset', 'p1',       # 最快预设
@@ -149,7 +149,7 @@ class FFmpegStreamer:
                     '-g', '25'
                 ] + common_opts
             else:
-                logger.info(f"FFmpeg Mode: CPU Low Latency ({self.camera_id})")
+                logger.info("FFmpeg Mode: CPU Low Latency (%s)", self.camera_id)
                 video_out_args = [
                     '-c:v', 'libx264', 
                     '-preset', 'ultrafast', 
@@ -218,14 +218,14 @@ class FFmpegStreamer:
                 threading.Thread(target=self._monitor_ffmpeg, daemon=True).start()
 
             except Exception as e:
-                logger.error(f"FFmpeg start failed: {e}")
+                logger.error("FFmpeg start failed: %s", e)
                 self.stop()
         finally:
             self._start_lock.release()
 
     def _trigger_restart(self, reason):
         if time.time() < FFmpegStreamer._global_cooldown_until: return
-        logger.warning(f"[Watchdog] {reason}. Restarting...")
+        logger.warning("[Watchdog] %s. Restarting...", reason)
         FFmpegStreamer._global_cooldown_until = time.time() + 5
         threading.Thread(target=self.start, daemon=True).start()
 
@@ -237,7 +237,7 @@ class FFmpegStreamer:
         while not self._stop_event.is_set():
             if self.process.poll() is not None:
                 if self.process.returncode not in [0, -9, 234, 111]:
-                    logger.error(f"FFmpeg exited: {self.process.returncode}")
+                    logger.error("FFmpeg exited: %s", self.process.returncode)
                 break
 
             try:
@@ -245,7 +245,7 @@ class FFmpegStreamer:
                     line = self.process.stderr.readline()
                     if line and "frame=" in line:
                         if time.time() - self._last_log_time > 60:
-                            logger.info(f"[RTSP] Alive | {line.strip()}")
+                            logger.info("[RTSP] Alive | %s", line.strip())
                             self._last_log_time = time.time()
                     elif "error" in line.lower() and "invalid argument" in line.lower():
                         self._trigger_restart(f"Fatal Config: {line}")
@@ -45,7 +45,7 @@ class MediaMtxManager:
             else:
                 arch = "amd64"
         else:
-            logger.error(f"Unsupported OS for MediaMTX auto-download: {system}")
+            logger.error("Unsupported OS for MediaMTX auto-download: %s", system)
             return
 
         url = f"https://github.com/bluenviron/mediamtx/releases/download/{version}/mediamtx_{version}_{os_name}_{arch}.tar.gz"
@@ -54,7 +54,7 @@ class MediaMtxManager:
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                logger.info(f"MediaMTX binary not found. Downloading from {url} (Attempt {attempt + 1}/{max_retries})...")
+                logger.info("MediaMTX binary not found. Downloading from %s (Attempt %s/%s)...", url, attempt + 1, max_retries)
                 
                 import tarfile
                 from io import BytesIO
@@ -85,7 +85,7 @@ class MediaMtxManager:
                 return  # 成功后直接返回
 
             except Exception as e:
-                logger.warning(f"Failed to download MediaMTX (Attempt {attempt + 1}): {e}")
+                logger.warning("Failed to download MediaMTX (Attempt %s): %s", attempt + 1, e)
                 if attempt < max_retries - 1:
                     logger.info("Retrying in 3 seconds...")
                     time.sleep(3)  # 失败后等待几秒再试
@@ -131,7 +131,7 @@ while true; do sleep 1; done
     def start(self):
         self.ensure_binary()
         if not os.path.exists(self.bin_path): 
-            logger.error(f"MediaMTX binary still missing at {self.bin_path}, skipping start.")
+            logger.error("MediaMTX binary still missing at %s, skipping start.", self.bin_path)
             return
 
         port = SERVER_CONFIG["port"]
@@ -156,7 +156,7 @@ hls: no
 webrtc: no
 """)
 
-        logger.info(f"Starting MediaMTX on port {self.port}...")
+        logger.info("Starting MediaMTX on port %s...", self.port)
         self.process = subprocess.Popen(
             [self.bin_path, config_path],
             stdout=subprocess.DEVNULL,